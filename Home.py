@@ -1,9 +1,16 @@
+import os
 import streamlit as st
+from perf_instrumentation import start_rerun, finish_rerun
+from query_store import DECISION_STORE_FILE
 from utils import (
-    load_metrics_data,
-    load_confusion_data,
+    load_query_repository,
+    load_study_names,
+    load_study_repository,
+    resolve_data_file,
+    render_study_page,
     create_study_page,
-    create_comparison_dashboard
+    create_comparison_dashboard,
+    batched_cards_setting
 )
 st.set_page_config(page_title="Systematic Reviews", page_icon="🏠",layout="wide",
    initial_sidebar_state="expanded",)
@@ -11,24 +18,39 @@ st.set_page_config(page_title="Systematic Reviews", page_icon="🏠",layout="wid
 
 # Main Streamlit App
 def main():
-    # Load metrics data from CSV file
-    metrics_data = load_metrics_data("metrics_data.csv")
+    # Start timing this rerun when DASHBOARD_PROFILE is set
+    start_rerun()
     
-    # Load confusion matrix data from CSV file
-    confusion_data = load_confusion_data("confusion_data.csv")
-    
-    # Get the list of unique study names
-    studies = metrics_data["Study"].unique()
-    
-    # Create a sidebar selectbox for choosing the study or comparison dashboard
-    page = st.sidebar.selectbox("Select a Page", studies.tolist() + ["Comparison Dashboard"])
-    
-    if page == "Comparison Dashboard":
-        # Create the comparison dashboard
-        create_comparison_dashboard([metrics_data[metrics_data["Study"] == study] for study in studies], [confusion_data[confusion_data["Study"] == study] for study in studies])
+    if os.path.exists(DECISION_STORE_FILE):
+        # Query the decision store directly; each page asks it for exactly the slice it draws
+        repository = load_query_repository(DECISION_STORE_FILE)
+        page = st.sidebar.selectbox("Select a Page", repository.studies + ["Comparison Dashboard"])
+        batched = batched_cards_setting()
+        
+        if page == "Comparison Dashboard":
+            create_comparison_dashboard(repository, batched=batched)
+        else:
+            create_study_page(page, repository, batched=batched)
     else:
-        # Create the study page for the selected study
-        create_study_page(page, metrics_data[metrics_data["Study"] == page], confusion_data[confusion_data["Study"] == page])
+        metrics_file = resolve_data_file("metrics_data")
+        confusion_file = resolve_data_file("confusion_data")
+        curves_file = resolve_data_file("recall_curves")
+        transitions_file = resolve_data_file("transition_data")
+        thresholds_file = resolve_data_file("threshold_curves")
+        
+        # Create a sidebar selectbox for choosing the study or comparison dashboard; only the Study column is read for it
+        page = st.sidebar.selectbox("Select a Page", load_study_names(metrics_file) + ["Comparison Dashboard"])
+        batched = batched_cards_setting()
+        
+        if page == "Comparison Dashboard":
+            # Load metrics and confusion matrix data of every study, indexed by study, and create the comparison dashboard
+            create_comparison_dashboard(load_study_repository(metrics_file, confusion_file, curves_file=curves_file), batched=batched)
+        else:
+            # Create the study page for the selected study, loading only its rows
+            render_study_page(page, metrics_file, confusion_file, curves_file, batched=batched, transitions_file=transitions_file, thresholds_file=thresholds_file)
+    
+    # Show and export the rerun's timings when profiling
+    finish_rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,108 @@
+import argparse
+import numpy as np
+import pandas as pd
+from metrics_engine import LABELS, safe_ratio
+from ingestion import CHUNK_SIZE, STAGE_COLUMNS, read_decision_chunks
+
+# Agreement columns of the per-study table, in display order
+AGREEMENT_COLUMNS = ["Records", "Observed Agreement", "Expected Agreement", "Cohen's Kappa", "Weighted Kappa (Linear)", "Weighted Kappa (Quadratic)"]
+
+# Function to count (first stage label, second stage label) transitions per study in one vectorized pass
+# Returns the study names and an int64 array of shape (studies, 3, 3) indexed by LABELS; records with a label outside LABELS are ignored.
+def transition_counts(decisions, study_column="Study", stage_columns=tuple(STAGE_COLUMNS)):
+    study_codes, studies = pd.factorize(decisions[study_column], sort=False)
+    first, second = (pd.Categorical(decisions[column], categories=LABELS).codes for column in stage_columns[:2])
+    valid = (study_codes >= 0) & (first >= 0) & (second >= 0)
+    flat = (study_codes * len(LABELS) + first) * len(LABELS) + second
+    counts = np.bincount(flat[valid], minlength=len(studies) * len(LABELS) ** 2)
+    return list(studies), counts.reshape(len(studies), len(LABELS), len(LABELS))
+
+# Function to get the disagreement weights of the ordinal labels (Include < Insufficient Information < Exclude)
+def disagreement_weights(kind="linear"):
+    distance = np.abs(np.subtract.outer(np.arange(len(LABELS)), np.arange(len(LABELS))))
+    if kind == "linear":
+        return distance / (len(LABELS) - 1)
+    if kind == "quadratic":
+        return (distance / (len(LABELS) - 1)) ** 2
+    if kind == "unweighted":
+        return (distance > 0).astype(float)
+    raise ValueError(f"Unknown weights: {kind}")
+
+# Function to compute weighted kappa for every study at once from transition counts of shape (studies, 3, 3)
+# kappa = 1 - sum(w * observed) / sum(w * expected), where expected is the outer product of the two stages' label totals;
+# with unweighted disagreement weights this is Cohen's kappa. Kappa is undefined (NaN) for studies without chance
+# disagreement, e.g. when both stages give every record the same label.
+def weighted_kappa(transitions, kind="linear"):
+    transitions = np.asarray(transitions, dtype=float)
+    total = transitions.sum(axis=(-2, -1))
+    expected = transitions.sum(axis=-1)[..., :, None] * transitions.sum(axis=-2)[..., None, :] / np.maximum(total, 1)[..., None, None]
+    weights = disagreement_weights(kind)
+    chance = (weights * expected).sum(axis=(-2, -1))
+    return np.where(chance > 0, 1 - safe_ratio((weights * transitions).sum(axis=(-2, -1)), chance), np.nan)
+
+# Function to compute Cohen's kappa for every study at once
+def cohen_kappa(transitions):
+    return weighted_kappa(transitions, "unweighted")
+
+# Function to compute the agreement table (AGREEMENT_COLUMNS per study) from transition counts
+def agreement_frame(studies, transitions):
+    transitions = np.asarray(transitions)
+    total = transitions.sum(axis=(-2, -1))
+    observed = safe_ratio(np.trace(transitions, axis1=-2, axis2=-1), total)
+    expected = safe_ratio((transitions.sum(axis=-1) * transitions.sum(axis=-2)).sum(axis=-1), total.astype(float) ** 2)
+    return pd.DataFrame({
+        "Study": studies,
+        "Records": total,
+        "Observed Agreement": observed.round(4),
+        "Expected Agreement": expected.round(4),
+        "Cohen's Kappa": cohen_kappa(transitions).round(4),
+        "Weighted Kappa (Linear)": weighted_kappa(transitions, "linear").round(4),
+        "Weighted Kappa (Quadratic)": weighted_kappa(transitions, "quadratic").round(4),
+    })
+
+# Function to lay transition counts out as the transition_data.csv table (one row per study and label pair)
+def transition_frame(studies, transitions, stage_columns=tuple(STAGE_COLUMNS.values())):
+    return pd.DataFrame({
+        "Study": np.repeat(studies, len(LABELS) ** 2),
+        stage_columns[0]: np.tile(np.repeat(LABELS, len(LABELS)), len(studies)),
+        stage_columns[1]: np.tile(LABELS, len(LABELS) * len(studies)),
+        "Count": np.asarray(transitions).reshape(-1),
+    })
+
+# Function to rebuild the (studies, 3, 3) transition counts from a transition_data.csv table; rows with a label outside LABELS are ignored
+def transitions_from_frame(frame, stage_columns=tuple(STAGE_COLUMNS.values())):
+    study_codes, studies = pd.factorize(frame["Study"], sort=False)
+    first, second = (pd.Categorical(frame[column], categories=LABELS).codes for column in stage_columns[:2])
+    valid = (study_codes >= 0) & (first >= 0) & (second >= 0)
+    transitions = np.zeros((len(studies), len(LABELS), len(LABELS)), dtype=np.int64)
+    np.add.at(transitions, (study_codes[valid], first[valid], second[valid]), frame["Count"].to_numpy(dtype=np.int64)[valid])
+    return list(studies), transitions
+
+# Function to stream decision logs into per-study transition counts
+def ingest_transitions(paths, chunksize=CHUNK_SIZE, study_column="Study", stage_columns=tuple(STAGE_COLUMNS)):
+    study_index = {}
+    transitions = np.zeros((0, len(LABELS), len(LABELS)), dtype=np.int64)
+    for path in paths:
+        for chunk in read_decision_chunks(path, [study_column, *stage_columns], chunksize):
+            studies, counts = transition_counts(chunk, study_column, stage_columns)
+            rows = [study_index.setdefault(study, len(study_index)) for study in studies]
+            if len(study_index) > len(transitions):
+                transitions = np.concatenate([transitions, np.zeros((len(study_index) - len(transitions), len(LABELS), len(LABELS)), dtype=np.int64)])
+            transitions[rows] += counts
+    return list(study_index), transitions
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute First Review vs Evaluation Step agreement (Cohen's and weighted kappa) per study")
+    parser.add_argument("logs", nargs="+", help="CSV or JSONL decision logs with Study, GPT-3.5 and GPT-4o columns")
+    parser.add_argument("--output", default="agreement.csv", help="per-study agreement table")
+    parser.add_argument("--transitions-out", default="transition_data.csv", help="per-study 3x3 transition counts read by the dashboard")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    studies, transitions = ingest_transitions(args.logs, args.chunksize)
+    agreement_frame(studies, transitions).to_csv(args.output, index=False)
+    transition_frame(studies, transitions).to_csv(args.transitions_out, index=False)
+    print(f"Wrote agreement for {len(studies)} studies to {args.output} and transitions to {args.transitions_out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# Import-time benchmark for the dashboard modules
+#
+# Each target is imported in a fresh interpreter under `python -X importtime`. The report gives the target's cumulative
+# import time, the time it adds on top of `import streamlit` (which every page pays anyway), the modules with the
+# largest self time, and any charting backend or component package the import pulled in eagerly.
+#
+#   python benchmarks/bench_imports.py --save-baseline benchmarks/import_baselines.json
+#   python benchmarks/bench_imports.py --compare benchmarks/import_baselines.json
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules imported by default
+TARGETS = ["utils", "study_repository", "metrics_engine"]
+
+# Module every dashboard page imports first; its cost is reported as the floor the targets are measured against
+FLOOR_MODULE = "streamlit"
+
+# Packages utils must only import from the functions that use them
+DEFERRED_MODULES = ["altair", "plotly.subplots", "local_components", "streamlit_extras", "scipy"]
+
+# A target regresses when its added import time grows by more than this fraction of the baseline
+REGRESSION_TOLERANCE = 0.25
+
+# Import time differences below this many seconds are treated as timer noise
+MIN_SECONDS_DELTA = 0.05
+
+# Function to import a module in a fresh interpreter and parse its -X importtime report into {module: (self_us, cumulative_us)}
+def import_times(module):
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times.setdefault(name.strip(), (int(self_us), int(cumulative_us)))
+    return times
+
+# Function to measure one target, keeping the fastest of several runs to damp disk-cache and scheduler noise
+def measure(module, floor, repeats):
+    runs = [import_times(module) for _ in range(repeats)]
+    best = min(runs, key=lambda times: times[module][1])
+    slowest = sorted(((self_us, name) for name, (self_us, _) in best.items() if name not in floor), reverse=True)[:10]
+    return {
+        "seconds": round(best[module][1] / 1e6, 4),
+        "added_seconds": round(sum(self_us for name, (self_us, _) in best.items() if name not in floor) / 1e6, 4),
+        "modules": len(best),
+        "eager_deferred": sorted(name for name in best if name not in floor and any(name == deferred or name.startswith(deferred + ".") for deferred in DEFERRED_MODULES)),
+        "slowest": [f"{name} {self_us / 1000:.1f}ms" for self_us, name in slowest],
+    }
+
+def run_benchmarks(targets, repeats):
+    floor = import_times(FLOOR_MODULE)
+    results = {}
+    for module in targets:
+        result = measure(module, floor, repeats)
+        results[f"import/{module}"] = result
+        print(f"{module}: {result['seconds']:.3f}s total, {result['added_seconds']:.3f}s over {FLOOR_MODULE}, {result['modules']} modules")
+        for entry in result["slowest"]:
+            print(f"    {entry}")
+        if result["eager_deferred"]:
+            print(f"    imported eagerly: {', '.join(result['eager_deferred'])}")
+    return results
+
+# Function to compare results against stored baselines and list the regressions
+def find_regressions(results, baselines, tolerance=REGRESSION_TOLERANCE):
+    regressions = []
+    for key, result in results.items():
+        if result["eager_deferred"]:
+            regressions.append(f"{key} imports {', '.join(result['eager_deferred'])} eagerly")
+        baseline = baselines.get(key)
+        if baseline and result["added_seconds"] > max(baseline["added_seconds"] * (1 + tolerance), baseline["added_seconds"] + MIN_SECONDS_DELTA):
+            regressions.append(f"{key} added_seconds: {baseline['added_seconds']} -> {result['added_seconds']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark for the dashboard modules")
+    parser.add_argument("--targets", nargs="+", default=TARGETS)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--save-baseline", default=None, help="write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="compare the results with this baseline JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.targets, args.repeats)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = find_regressions(results, json.load(f))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+# Headless render benchmark for Home.main, create_study_page and create_comparison_dashboard
+#
+# Streamlit 1.26 has no app-testing harness, so each scenario runs under a ScriptRunContext whose enqueue
+# callback records the ForwardMsg protos the frontend would receive. For synthetic datasets of 1, 10, 100
+# and 1000 studies it reports wall time (cold and warm reruns), peak traced memory and serialized payload bytes.
+#
+#   python benchmarks/bench_render.py --save-baseline benchmarks/baselines.json
+#   python benchmarks/bench_render.py --compare benchmarks/baselines.json
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.runtime.memory_uploaded_file_manager import MemoryUploadedFileManager
+from streamlit.runtime.scriptrunner import ScriptRunContext, add_script_run_ctx
+from streamlit.runtime.state import SafeSessionState, SessionState
+from metrics_engine import METRIC_DESCRIPTIONS, METRICS
+from ingestion import CONFUSION_BLOCKS
+
+# Study counts of the synthetic datasets
+SIZES = [1, 10, 100, 1000]
+
+# A scenario regresses when its warm wall time or payload grows by more than this fraction of the baseline
+REGRESSION_TOLERANCE = 0.25
+
+# Wall time differences below this many seconds are treated as timer noise
+MIN_SECONDS_DELTA = 0.05
+
+# Class to collect the messages a headless run would send to the browser
+class RecordingSession:
+    def __init__(self):
+        self.messages = []
+        self.ctx = ScriptRunContext(
+            session_id="benchmark",
+            _enqueue=self.messages.append,
+            query_string="",
+            session_state=SafeSessionState(SessionState()),
+            uploaded_file_mgr=MemoryUploadedFileManager("/benchmark"),
+            page_script_hash="benchmark",
+            user_info={"email": None},
+        )
+        add_script_run_ctx(threading.current_thread(), self.ctx)
+
+    # Function to start a new rerun, forgetting the messages and widget ids of the previous one
+    def rerun(self):
+        self.messages.clear()
+        self.ctx.widget_ids_this_run.clear()
+        self.ctx.widget_user_keys_this_run.clear()
+        self.ctx.form_ids_this_run.clear()
+        self.ctx.cursors.clear()
+
+    # Function to report the number and total serialized size of the recorded messages
+    def payload(self):
+        return len(self.messages), sum(message.ByteSize() for message in self.messages)
+
+# Function to write synthetic metrics_data.csv and confusion_data.csv files for a number of studies
+def write_synthetic_data(directory, num_studies, seed=0):
+    rng = np.random.default_rng(seed)
+    studies = [f"Synthetic Review {i + 1:04d}" for i in range(num_studies)]
+
+    gpt3_5 = rng.uniform(0.80, 0.99, (num_studies, len(METRICS)))
+    gpt4 = np.minimum(gpt3_5 + rng.uniform(0.0, 0.1, gpt3_5.shape), 1.0)
+    metrics_data = pd.DataFrame({
+        "Study": np.repeat(studies, len(METRICS)),
+        "Metric": np.tile(METRICS, num_studies),
+        "GPT-3.5 Average": gpt3_5.ravel().round(4),
+        "GPT-4 Average": gpt4.ravel().round(4),
+    })
+    metrics_data["Improvement"] = [f"{value:+.2f}%" for value in 100 * (gpt4 - gpt3_5).ravel() / gpt3_5.ravel()]
+    metrics_data["Description"] = metrics_data["Metric"].map(METRIC_DESCRIPTIONS)
+
+    categories = [category for _, block in CONFUSION_BLOCKS for category in block]
+    confusion_data = pd.DataFrame({
+        "Study": np.repeat(studies, len(categories)),
+        "Category": np.tile(categories, num_studies),
+        "First Review": rng.integers(0, 3000, num_studies * len(categories)),
+        "Evaluation Step": rng.integers(0, 3000, num_studies * len(categories)),
+    })
+
+    metrics_data.to_csv(os.path.join(directory, "metrics_data.csv"), index=False)
+    confusion_data.to_csv(os.path.join(directory, "confusion_data.csv"), index=False)
+    return studies
+
+# Function to clear every process-wide cache so the first run of a scenario is cold
+def clear_caches():
+    import streamlit as st
+    from figure_cache import FIGURE_CACHE
+
+    st.cache_resource.clear()
+    FIGURE_CACHE.clear()
+
+# Function to get the render scenarios: name -> callable taking the study list
+def scenarios():
+    import Home
+    import utils
+
+    def repository():
+        return utils.load_study_repository("metrics_data.csv", "confusion_data.csv")
+
+    return {
+        "home": lambda studies: Home.main(),
+        "study_page": lambda studies: utils.create_study_page(studies[-1], repository()),
+        "comparison_dashboard": lambda studies: utils.create_comparison_dashboard(repository()),
+        "comparison_dashboard_eager": lambda studies: utils.create_comparison_dashboard(repository(), lazy=False),
+    }
+
+# Function to time one scenario: one cold run after clearing caches, then warm reruns
+def run_scenario(session, render, studies, repeats):
+    clear_caches()
+    session.rerun()
+    tracemalloc.start()
+    start = time.perf_counter()
+    render(studies)
+    cold = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    num_messages, payload_bytes = session.payload()
+
+    warm = []
+    for _ in range(repeats):
+        session.rerun()
+        start = time.perf_counter()
+        render(studies)
+        warm.append(time.perf_counter() - start)
+
+    return {
+        "cold_seconds": round(cold, 4),
+        "warm_seconds": round(statistics.median(warm), 4) if warm else None,
+        "peak_memory_bytes": peak,
+        "messages": num_messages,
+        "payload_bytes": payload_bytes,
+    }
+
+# Function to run every scenario for every dataset size
+def run_benchmarks(sizes, selected, repeats):
+    session = RecordingSession()
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            available = scenarios()
+            for size in sizes:
+                studies = write_synthetic_data(directory, size)
+                for name in selected or available:
+                    key = f"{name}/{size}"
+                    results[key] = run_scenario(session, available[name], studies, repeats)
+                    print(f"{key:40s} " + " ".join(f"{field}={value}" for field, value in results[key].items()), flush=True)
+        finally:
+            os.chdir(cwd)
+    return results
+
+# Function to compare results against stored baselines and list the regressions
+def find_regressions(results, baselines, tolerance=REGRESSION_TOLERANCE):
+    regressions = []
+    for key, result in results.items():
+        baseline = baselines.get(key)
+        if baseline is None:
+            continue
+        for field, floor in (("warm_seconds", MIN_SECONDS_DELTA), ("payload_bytes", 0)):
+            if baseline.get(field) and result.get(field) and result[field] > max(baseline[field] * (1 + tolerance), baseline[field] + floor):
+                regressions.append(f"{key} {field}: {baseline[field]} -> {result[field]}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless render benchmark for the dashboard pages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--scenarios", nargs="+", default=None)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--save-baseline", default=None, help="write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="compare the results with this baseline JSON file")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.scenarios, args.repeats)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = find_regressions(results, json.load(f))
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import re
+import time
+import pandas as pd
+from metrics_engine import METRICS, metrics_from_decisions
+from response_cache import ResponseCache
+from screening import DEFAULT_PROMPT, ChatCompletionsClient, ScreeningRunner, parse_decision
+
+# Cascade prompt: the screening prompt plus a confidence line the scheduler can threshold on
+CASCADE_PROMPT = DEFAULT_PROMPT + "\nOn a second line, give your confidence between 0 and 1 as 'Confidence: <number>'."
+
+logger = logging.getLogger(__name__)
+
+# First Review decisions that are always escalated to the Evaluation Step
+ESCALATE_LABELS = ("Insufficient Information",)
+
+# Function to read the confidence a model reported in its reply, or None if it gave none
+def parse_confidence(text):
+    match = re.search(r"confidence\W*([01](?:\.\d+)?)", text, re.IGNORECASE)
+    return float(match.group(1)) if match else None
+
+# Function to decide deterministically whether a record falls in the audit sample, so resumed runs audit the same records
+def in_audit_sample(record_id, audit_rate, seed=0):
+    digest = hashlib.sha1(f"{seed}\0{record_id}".encode()).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64 < audit_rate
+
+# Class to run the First Review on every record but send only uncertain records and an audit sample to the Evaluation Step
+# The Evaluation Step column holds the cascade's final decision: the second model's answer when escalated, otherwise the first's.
+class CascadeRunner(ScreeningRunner):
+    def __init__(self, client, criteria, escalate_labels=ESCALATE_LABELS, confidence_threshold=None, audit_rate=0.05, seed=0, prompt_template=CASCADE_PROMPT, **kwargs):
+        super().__init__(client, criteria, prompt_template=prompt_template, **kwargs)
+        self.escalate_labels = tuple(escalate_labels)
+        self.confidence_threshold = confidence_threshold
+        self.audit_rate = audit_rate
+        self.seed = seed
+
+    # Function to get why a First Review decision is escalated, or None when it is final
+    # With a confidence threshold, a reply without a parsable confidence counts as uncertain and is escalated.
+    def escalation_reason(self, record_id, decision, confidence):
+        if decision in self.escalate_labels:
+            return "label"
+        if self.confidence_threshold is not None and (confidence is None or confidence < self.confidence_threshold):
+            return "low_confidence"
+        if in_audit_sample(record_id, self.audit_rate, self.seed):
+            return "audit"
+        return None
+
+    async def screen_record(self, bucket, record):
+        first_column, second_column = list(self.stages)[:2]
+        human = record.get("Human")
+        row = {"Study": record["Study"], "record_id": record["record_id"], "Human": None if pd.isna(human) else human}
+
+        reply = await self.reply(bucket, self.stages[first_column], record)
+        row[first_column] = parse_decision(reply)
+        row["Confidence"] = parse_confidence(reply)
+        row["Escalation"] = self.escalation_reason(record["record_id"], row[first_column], row["Confidence"])
+        if row["Escalation"] is None:
+            row[second_column] = row[first_column]
+        else:
+            row[second_column] = parse_decision(await self.reply(bucket, self.stages[second_column], record))
+        return row
+
+# Function to screen records through the cascade and return its decision log
+def run_cascade(records, client, criteria, **kwargs):
+    runner = CascadeRunner(client, criteria, **kwargs)
+    rows = asyncio.run(runner.run(records.to_dict("records")))
+    if runner.failures:
+        logger.warning("%d records failed and were left out of the checkpoint; rerun to retry them", len(runner.failures))
+    return pd.DataFrame(rows, columns=["Study", "record_id", "Human", *runner.stages, "Confidence", "Escalation"])
+
+# Function to summarize, per study, how many Evaluation Step calls the cascade made and saved, and how often audited records changed
+def cascade_savings(decisions, first_column="GPT-3.5", second_column="GPT-4o"):
+    audited = decisions["Escalation"] == "audit"
+    changed = audited & (decisions[first_column] != decisions[second_column])
+    summary = pd.DataFrame({
+        "Records": decisions.groupby("Study", sort=False).size(),
+        "Escalated": decisions["Escalation"].notna().groupby(decisions["Study"], sort=False).sum(),
+        "Audited": audited.groupby(decisions["Study"], sort=False).sum(),
+        "Audit Changes": changed.groupby(decisions["Study"], sort=False).sum(),
+    })
+    summary["Calls Saved"] = summary["Records"] - summary["Escalated"]
+    summary["Saved %"] = (100 * summary["Calls Saved"] / summary["Records"]).round(2)
+    summary["Audit Change Rate"] = (summary["Audit Changes"] / summary["Audited"].where(summary["Audited"] > 0)).round(4)
+    return summary.reset_index()
+
+# Function to compare the cascade's metrics with the full Evaluation Step re-evaluation from metrics_data, per study and metric
+# Needs Human labels on the screened records; the cascade's final decisions are scored as the "GPT-4 Average" column.
+def cascade_metrics_comparison(decisions, metrics_data):
+    labelled = decisions[decisions["Human"].notna()]
+    cascade = metrics_from_decisions(labelled)[["Study", "Metric", "GPT-4 Average"]].rename(columns={"GPT-4 Average": "Cascade"})
+    full = metrics_data[["Study", "Metric", "GPT-4 Average"]].rename(columns={"GPT-4 Average": "Full Re-evaluation"})
+    comparison = cascade.merge(full, on=["Study", "Metric"], how="left")
+    comparison["Difference"] = (comparison["Cascade"] - comparison["Full Re-evaluation"]).round(4)
+    comparison["Metric"] = pd.Categorical(comparison["Metric"], categories=METRICS, ordered=True)
+    return comparison.sort_values(["Study", "Metric"], kind="stable").reset_index(drop=True)
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen records with a cascade that escalates only uncertain records to the Evaluation Step")
+    parser.add_argument("records", help="CSV with Study, record_id, Title, Abstract and optionally Human columns")
+    parser.add_argument("--criteria", required=True, help="text file with the eligibility criteria")
+    parser.add_argument("--base-url", default="https://api.openai.com/v1")
+    parser.add_argument("--output", default="cascade_decisions.jsonl", help="decision log, also used as the resume checkpoint")
+    parser.add_argument("--confidence-threshold", type=float, default=0.7)
+    parser.add_argument("--audit-rate", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=10.0, help="maximum model calls per second")
+    parser.add_argument("--cache", default=None, help="SQLite file caching model replies across runs")
+    parser.add_argument("--metrics", default=None, help="metrics_data.csv holding the full re-evaluation to compare against")
+    args = parser.parse_args()
+
+    with open(args.criteria) as f:
+        criteria = f.read()
+    records = pd.read_csv(args.records, dtype={"record_id": str})
+    cache = ResponseCache(args.cache) if args.cache else None
+    start = time.perf_counter()
+    run_cascade(records, ChatCompletionsClient(args.base_url), criteria, confidence_threshold=args.confidence_threshold, audit_rate=args.audit_rate, concurrency=args.concurrency, rate=args.rate, checkpoint_path=args.output, cache=cache)
+    print(f"Cascade finished in {time.perf_counter() - start:.1f}s; decisions appended to {args.output}")
+
+    decisions = pd.read_json(args.output, lines=True, dtype={"record_id": str})
+    print(cascade_savings(decisions).to_string(index=False))
+    if args.metrics:
+        print(cascade_metrics_comparison(decisions, pd.read_csv(args.metrics)).to_string(index=False))
+
+if __name__ == "__main__":
+    main()
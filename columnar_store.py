@@ -0,0 +1,65 @@
+import argparse
+import os
+import pandas as pd
+
+# File suffixes served by the columnar backend, in the order they are preferred over CSV
+COLUMNAR_SUFFIXES = (".parquet", ".arrow")
+
+# pyarrow is imported by the functions that read or write columnar files, so CSV-only dashboards never load it
+
+# Function to check whether a data file is stored in a columnar format
+def is_columnar(path):
+    return str(path).endswith(COLUMNAR_SUFFIXES)
+
+# Function to convert a CSV data file to Parquet, writing one row group per study so reads can skip other studies
+def csv_to_parquet(csv_file, parquet_file):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    df = pd.read_csv(csv_file)
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    with pq.ParquetWriter(parquet_file, schema) as writer:
+        for _, df_study in df.groupby("Study", sort=False):
+            writer.write_table(pa.Table.from_pandas(df_study, schema=schema, preserve_index=False))
+
+# Function to convert a CSV data file to an Arrow IPC file that can be memory-mapped without copying
+def csv_to_arrow(csv_file, arrow_file):
+    import pyarrow as pa
+    table = pa.Table.from_pandas(pd.read_csv(csv_file), preserve_index=False)
+    with pa.OSFile(arrow_file, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+# Function to read a columnar data file, optionally only the rows of one study and a subset of columns
+def read_columnar(path, study=None, columns=None):
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+    if str(path).endswith(".parquet"):
+        filters = [("Study", "==", study)] if study is not None else None
+        table = pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+    else:
+        with pa.memory_map(str(path)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        if columns is not None:
+            table = table.select(columns)
+        if study is not None:
+            table = table.filter(pc.equal(table["Study"], study))
+    return table.to_pandas()
+
+# Function to list the studies in a columnar data file by reading only the Study column
+def read_columnar_studies(path):
+    return read_columnar(path, columns=["Study"])["Study"].unique().tolist()
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert metrics/confusion CSV files to a columnar format")
+    parser.add_argument("csv_files", nargs="+")
+    parser.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    args = parser.parse_args()
+
+    convert = csv_to_parquet if args.format == "parquet" else csv_to_arrow
+    for csv_file in args.csv_files:
+        target = f"{os.path.splitext(csv_file)[0]}.{args.format}"
+        convert(csv_file, target)
+        print(f"{csv_file} -> {target}")
+
+if __name__ == "__main__":
+    main()
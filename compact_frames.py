@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+# Decimals float columns are rounded to when compacted; float32 keeps about 7 significant digits, so these survive the cast
+FLOAT_DECIMALS = 6
+
+# Function to mark an array read-only and return it
+def _read_only(values):
+    values.flags.writeable = False
+    return values
+
+# Function to convert a frame to the compact, read-only form shared by every session
+# Text columns (labels and the repeated Description/Improvement strings) become categoricals, so each distinct string is
+# stored once; floats are rounded to FLOAT_DECIMALS and become float32, and integers int32 where they fit. Every column keeps its own read-only array, so
+# an accidental in-place write from one session raises instead of changing what the other sessions see.
+def compact_frame(df):
+    columns = {}
+    for name, column in df.items():
+        if isinstance(column.dtype, pd.CategoricalDtype) or column.dtype == object or pd.api.types.is_string_dtype(column.dtype):
+            categorical = pd.Categorical(column)
+            columns[name] = pd.Categorical.from_codes(_read_only(categorical.codes.copy()), dtype=categorical.dtype)
+        elif pd.api.types.is_float_dtype(column.dtype):
+            columns[name] = _read_only(column.to_numpy(dtype=np.float64).round(FLOAT_DECIMALS).astype(np.float32))
+        elif pd.api.types.is_integer_dtype(column.dtype) and (column.empty or np.iinfo(np.int32).min <= column.min() and column.max() <= np.iinfo(np.int32).max):
+            columns[name] = _read_only(column.to_numpy(dtype=np.int32, copy=True))
+        else:
+            columns[name] = _read_only(column.to_numpy(copy=True))
+    return pd.DataFrame(columns, index=pd.RangeIndex(len(df)), copy=False)
+
+# Function to widen the float32 columns of a compacted frame back to float64 at the decimals they were compacted to
+# Needed where values leave numpy as Python floats (row dicts), so 0.9881 does not come back as 0.98809999
+def widen_floats(df):
+    float32_columns = [name for name, dtype in df.dtypes.items() if dtype == np.float32]
+    return df.astype({name: np.float64 for name in float32_columns}).round({name: FLOAT_DECIMALS for name in float32_columns})
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+from metrics_engine import LABELS, METRICS, MODEL_COLUMNS, POSITIVE_LABELS, compute_metrics
+
+# Bootstrap resamples drawn per study
+RESAMPLES = 10_000
+
+# Coverage of the reported intervals
+CONFIDENCE_LEVEL = 0.95
+
+# Studies resampled per batched draw; bounds the (resamples, studies, ...) arrays to a few hundred MB
+BOOTSTRAP_BLOCK_STUDIES = 32
+
+# Interval columns added next to the metrics_data.csv averages, per model and for the paired GPT-4o - GPT-3.5 difference
+INTERVAL_COLUMNS = [f"{average.replace(' Average', '')} {bound}" for average in MODEL_COLUMNS.values() for bound in ("Lower", "Upper")] + ["Difference Lower", "Difference Upper"]
+
+# Function to count decisions per (study, human label, first model label, second model label), keeping the pairing of the two models
+# Returns the study names and an int64 array of shape (studies, 2, 3, 3); records with a label outside LABELS or without a Human label are ignored.
+def joint_counts(decisions, study_column="Study", truth_column="Human", model_columns=tuple(MODEL_COLUMNS)):
+    study_codes, studies = pd.factorize(decisions[study_column], sort=False)
+    truth_codes = np.where(decisions[truth_column].to_numpy() == "Include", 0, 1)
+    first, second = (pd.Categorical(decisions[column], categories=LABELS).codes for column in model_columns[:2])
+    valid = (study_codes >= 0) & (first >= 0) & (second >= 0) & decisions[truth_column].notna().to_numpy()
+    flat = ((study_codes * 2 + truth_codes) * len(LABELS) + first) * len(LABELS) + second
+    counts = np.bincount(flat[valid], minlength=len(studies) * 2 * len(LABELS) ** 2)
+    return list(studies), counts.reshape(len(studies), 2, len(LABELS), len(LABELS))
+
+# Function to draw bootstrap resamples of count cells in one batched multinomial draw
+# Resampling n records with replacement is a multinomial draw over the cells, so no per-record arrays are materialized.
+def resample_counts(cells, resamples, rng):
+    cells = np.asarray(cells)
+    totals = cells.sum(axis=-1)
+    probabilities = cells / np.maximum(totals, 1)[..., None]
+    probabilities[totals == 0] = 1 / cells.shape[-1]
+    return rng.multinomial(totals, probabilities, size=(resamples,) + totals.shape)
+
+# Function to collapse the model-label axes of counts into (positive, negative) predictions; the metrics only depend on these
+def collapse_labels(counts, axes, positive_labels=POSITIVE_LABELS):
+    positive = np.isin(LABELS, positive_labels)
+    for axis in axes:
+        counts = np.stack([np.compress(positive, counts, axis=axis).sum(axis=axis), np.compress(~positive, counts, axis=axis).sum(axis=axis)], axis=axis)
+    return counts
+
+# Function to compute the metrics of resampled binary counts (..., 2 human labels, 2 predictions), stacked along a new metrics axis
+def metric_samples(binary, average="weighted"):
+    metrics = compute_metrics(binary[..., 0, 0], binary[..., 1, 0], binary[..., 0, 1], binary[..., 1, 1], average=average)
+    return np.stack([metrics[name] for name in METRICS], axis=-1)
+
+# Function to compute percentile bootstrap intervals of every metric, per model and for the GPT-4o - GPT-3.5 difference
+# counts is either per-model counts (studies, models, 2, 3), resampled independently per model, or with paired=True the
+# joint counts (studies, 2, 3, 3) of joint_counts, resampled per record so the difference interval accounts for the pairing.
+# Returns lower/upper arrays of shape (studies, metrics, models) and difference_lower/difference_upper of shape (studies, metrics).
+def bootstrap_intervals(counts, resamples=RESAMPLES, level=CONFIDENCE_LEVEL, seed=0, paired=False, positive_labels=POSITIVE_LABELS, average="weighted"):
+    counts = collapse_labels(np.asarray(counts), (-2, -1) if paired else (-1,), positive_labels)
+    rng = np.random.default_rng(seed)
+    quantiles = [(1 - level) / 2, (1 + level) / 2]
+    num_models = 2 if paired else counts.shape[1]
+    bounds = np.zeros((2, len(counts), num_models, len(METRICS)))
+    difference = np.zeros((2, len(counts), len(METRICS)))
+
+    for start in range(0, len(counts), BOOTSTRAP_BLOCK_STUDIES):
+        block = counts[start:start + BOOTSTRAP_BLOCK_STUDIES]
+        if paired:
+            joint = resample_counts(block.reshape(len(block), -1), resamples, rng).reshape((resamples,) + block.shape)
+            sampled = np.stack([joint.sum(axis=-1), joint.sum(axis=-2)], axis=2)
+        else:
+            sampled = resample_counts(block.reshape(block.shape[:2] + (-1,)), resamples, rng).reshape((resamples,) + block.shape)
+        # Resamples go last so the quantiles partition contiguous rows
+        samples = np.moveaxis(metric_samples(sampled, average), 0, -1)
+        bounds[:, start:start + len(block)] = np.quantile(samples, quantiles, axis=-1)
+        difference[:, start:start + len(block)] = np.quantile(samples[:, -1] - samples[:, 0], quantiles, axis=-1)
+
+    bounds = bounds.swapaxes(2, 3)
+    return {"lower": bounds[0], "upper": bounds[1], "difference_lower": difference[0], "difference_upper": difference[1]}
+
+# Function to lay bootstrap intervals out as Study, Metric and INTERVAL_COLUMNS rows matching metrics_data.csv
+def interval_frame(studies, intervals):
+    frame = pd.DataFrame({"Study": np.repeat(studies, len(METRICS)), "Metric": np.tile(METRICS, len(studies))})
+    for i, average in enumerate(MODEL_COLUMNS.values()):
+        model = average.replace(" Average", "")
+        frame[f"{model} Lower"] = intervals["lower"][:, :, i].ravel().round(4)
+        frame[f"{model} Upper"] = intervals["upper"][:, :, i].ravel().round(4)
+    frame["Difference Lower"] = intervals["difference_lower"].ravel().round(4)
+    frame["Difference Upper"] = intervals["difference_upper"].ravel().round(4)
+    return frame
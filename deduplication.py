@@ -0,0 +1,137 @@
+import argparse
+import os
+import re
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+# Number of hash permutations in each MinHash signature
+NUM_PERM = 128
+
+# LSH bands the signature is split into; NUM_PERM / LSH_BANDS rows per band puts the candidate threshold near 0.7 Jaccard
+LSH_BANDS = 16
+
+# Estimated Jaccard similarity at or above which two records are treated as duplicates
+DUPLICATE_THRESHOLD = 0.8
+
+# Records hashed per process-pool task
+MINHASH_CHUNK_SIZE = 5_000
+
+# Modulus of the universal hash family used to permute shingle hashes; a * x + b wraps it many times for 31-bit a and x
+_PRIME = np.uint64((1 << 31) - 1)
+
+# Signature value of a record without any shingles; such records are never matched
+_EMPTY = np.iinfo(np.uint64).max
+
+# Function to normalize record text and split it into word 3-gram shingles
+def shingles(text, size=3):
+    words = re.findall(r"\w+", str(text).lower())
+    if len(words) < size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+# Function to draw the (a, b) coefficients of the hash permutations
+def permutations(num_perm=NUM_PERM, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.integers(1, _PRIME, num_perm, dtype=np.uint64), rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+
+# Function to compute the MinHash signatures of a list of texts, shape (len(texts), num_perm)
+def minhash_signatures(texts, num_perm=NUM_PERM, seed=1):
+    a, b = permutations(num_perm, seed)
+    signatures = np.full((len(texts), num_perm), _EMPTY, dtype=np.uint64)
+    for i, text in enumerate(texts):
+        hashes = np.fromiter((zlib.crc32(shingle.encode()) for shingle in shingles(text)), dtype=np.uint64) % _PRIME
+        if len(hashes):
+            signatures[i] = ((hashes[:, None] * a + b) % _PRIME).min(axis=0)
+    return signatures
+
+# Function to compute MinHash signatures across a process pool in fixed-size chunks
+def parallel_minhash_signatures(texts, num_perm=NUM_PERM, seed=1, workers=None, chunksize=MINHASH_CHUNK_SIZE):
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    if workers == 1 or len(chunks) <= 1:
+        return np.vstack([minhash_signatures(chunk, num_perm, seed) for chunk in chunks]) if chunks else np.empty((0, num_perm), dtype=np.uint64)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return np.vstack(list(pool.map(minhash_signatures, chunks, [num_perm] * len(chunks), [seed] * len(chunks))))
+
+# Function to find the root of a record in the union-find parent array, compressing the path
+def _find(parent, i):
+    root = i
+    while parent[root] != root:
+        root = parent[root]
+    while parent[i] != root:
+        parent[i], i = root, parent[i]
+    return root
+
+# Function to group records into duplicate clusters with LSH banding
+# Records sharing a band bucket are verified against the bucket's first member, so the work per bucket is linear in its size.
+# With `groups` (one integer code per record), the code is part of every bucket key, so records of different groups never match.
+def lsh_clusters(signatures, bands=LSH_BANDS, threshold=DUPLICATE_THRESHOLD, groups=None):
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    parent = np.arange(n)
+    valid = np.flatnonzero(signatures[:, 0] != _EMPTY)
+    group_values = np.zeros((len(valid), 1), dtype=np.uint64) if groups is None else np.asarray(groups, dtype=np.uint64)[valid, None]
+
+    for band in range(bands):
+        band_values = np.ascontiguousarray(np.hstack([group_values, signatures[valid, band * rows:(band + 1) * rows]]))
+        _, bucket, counts = np.unique(band_values.view(np.dtype((np.void, band_values.dtype.itemsize * (rows + 1)))).ravel(), return_inverse=True, return_counts=True)
+        shared = counts[bucket] > 1
+        if not shared.any():
+            continue
+        members = valid[shared]
+        order = np.argsort(bucket[shared], kind="stable")
+        members, member_buckets = members[order], bucket[shared][order]
+        heads = members[np.r_[0, np.flatnonzero(np.diff(member_buckets)) + 1]]
+        head_of = heads[np.searchsorted(np.unique(member_buckets), member_buckets)]
+        similarity = (signatures[members] == signatures[head_of]).mean(axis=1)
+        for i, j in zip(members[similarity >= threshold], head_of[similarity >= threshold]):
+            root_i, root_j = _find(parent, i), _find(parent, j)
+            if root_i != root_j:
+                parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    return np.array([_find(parent, i) for i in range(n)])
+
+# Function to find duplicate clusters in title/abstract records and pick a canonical record per cluster
+# Records are only clustered within their study (when the records have a Study column), since every study screens its own
+# copy. The canonical record is the one with the longest text, so the most complete export of a record is screened; it is
+# picked by row position, as record ids repeat across studies.
+def find_duplicates(records, threshold=DUPLICATE_THRESHOLD, num_perm=NUM_PERM, bands=LSH_BANDS, workers=None, study_column="Study"):
+    texts = (records["Title"].fillna("").astype(str) + " " + records["Abstract"].fillna("").astype(str)).tolist()
+    signatures = parallel_minhash_signatures(texts, num_perm, workers=workers)
+    groups = pd.factorize(records[study_column])[0] + 1 if study_column in records else None
+    cluster = lsh_clusters(signatures, bands, threshold, groups)
+
+    clusters = pd.DataFrame({"record_id": records["record_id"].to_numpy(), "cluster": cluster, "length": [len(text) for text in texts]})
+    if study_column in records:
+        clusters.insert(0, study_column, records[study_column].to_numpy())
+    canonical = clusters.sort_values(["cluster", "length"], ascending=[True, False], kind="stable").drop_duplicates("cluster")
+    canonical_row = clusters["cluster"].map(pd.Series(canonical.index, index=canonical["cluster"]))
+    clusters["canonical_record_id"] = clusters["cluster"].map(canonical.set_index("cluster")["record_id"])
+    clusters["is_canonical"] = canonical_row.to_numpy() == np.arange(len(clusters))
+    clusters["cluster_size"] = clusters.groupby("cluster")["record_id"].transform("size")
+    return clusters.drop(columns="length")
+
+# Function to drop the non-canonical duplicates from the records, returning the kept records and the cluster table
+def deduplicate(records, **kwargs):
+    clusters = find_duplicates(records, **kwargs)
+    return records[clusters["is_canonical"].to_numpy()], clusters
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove near-duplicate title/abstract records before screening")
+    parser.add_argument("records", help="CSV with record_id, Title, Abstract and optionally Study columns")
+    parser.add_argument("--output", required=True, help="CSV of the canonical records to screen")
+    parser.add_argument("--clusters", default=None, help="CSV of duplicate clusters (clusters with more than one record)")
+    parser.add_argument("--threshold", type=float, default=DUPLICATE_THRESHOLD)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    records = pd.read_csv(args.records, dtype={"record_id": str})
+    kept, clusters = deduplicate(records, threshold=args.threshold, workers=args.workers)
+    kept.to_csv(args.output, index=False)
+    if args.clusters:
+        clusters[clusters["cluster_size"] > 1].to_csv(args.clusters, index=False)
+    print(f"Kept {len(kept)} of {len(records)} records; {len(records) - len(kept)} duplicates removed")
+
+if __name__ == "__main__":
+    main()
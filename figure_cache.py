@@ -0,0 +1,67 @@
+import hashlib
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+# Maximum number of figures kept in the process-wide cache
+FIGURE_CACHE_MAX_ENTRIES = 512
+
+# Function to build a cache key from the figure kind, a content hash of its input slice and its title
+def figure_key(kind, data, title):
+    digest = hashlib.sha1(f"{kind}\0{title}\0".encode())
+    if isinstance(data, pd.DataFrame):
+        digest.update("\0".join(map(str, data.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=False).to_numpy().tobytes())
+    else:
+        digest.update(repr(data).encode())
+    return digest.hexdigest()
+
+# Class to keep built Plotly figures with LRU eviction and hit/miss counters
+# The cache saves figure construction only; st.plotly_chart still serializes the figure on every call.
+# Cached figures are shared by every session and must not be mutated by callers
+class FigureCache:
+    def __init__(self, max_entries=FIGURE_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    # Function to return the cached figure for a key, building it on a miss
+    def get_or_create(self, key, build):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        figure = build()
+        with self._lock:
+            self._entries[key] = figure
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return figure
+
+    # Function to report cache counters
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    # Function to drop every cached figure and reset the counters
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+# Process-wide figure cache shared by all sessions
+FIGURE_CACHE = FigureCache()
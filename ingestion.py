@@ -0,0 +1,114 @@
+import argparse
+import numpy as np
+import pandas as pd
+from metrics_engine import LABELS, binary_counts, compute_metrics, decision_counts, metrics_frame
+from confidence_intervals import RESAMPLES, bootstrap_intervals, interval_frame, joint_counts
+
+# Default number of decision records read per chunk
+CHUNK_SIZE = 100_000
+
+# confusion_data.csv column filled from each model's decisions
+STAGE_COLUMNS = {"GPT-3.5": "First Review", "GPT-4o": "Evaluation Step"}
+
+# Row blocks of confusion_data.csv: the human label of each block and the order of its Category rows
+CONFUSION_BLOCKS = [
+    ("Include", ["Include", "Insufficient Information", "Exclude"]),
+    ("Exclude", ["Exclude", "Insufficient Information", "Include"]),
+]
+
+# Function to iterate over a CSV or JSONL decision log in fixed-size chunks
+def read_decision_chunks(path, columns, chunksize=CHUNK_SIZE):
+    if str(path).endswith((".jsonl", ".ndjson", ".json")):
+        with pd.read_json(path, lines=True, chunksize=chunksize, dtype=False) as reader:
+            for chunk in reader:
+                yield chunk[columns]
+    else:
+        with pd.read_csv(path, usecols=columns, dtype=str, chunksize=chunksize) as reader:
+            yield from reader
+
+# Function to lay decision counts of shape (studies, models, 2, 3) out as the confusion_data.csv table
+def confusion_frame(studies, counts, model_columns=tuple(STAGE_COLUMNS)):
+    truth = [t for t, (_, categories) in enumerate(CONFUSION_BLOCKS) for _ in categories]
+    categories = [category for _, block in CONFUSION_BLOCKS for category in block]
+    labels = [LABELS.index(category) for category in categories]
+    frame = pd.DataFrame({
+        "Study": np.repeat(studies, len(categories)),
+        "Category": np.tile(categories, len(studies)),
+    })
+    for i, column in enumerate(model_columns):
+        frame[STAGE_COLUMNS.get(column, column)] = counts[:, i, truth, labels].ravel()
+    return frame
+
+# Class to fold decision chunks into per-study counts; memory grows with the number of studies, not records
+class ConfusionAccumulator:
+    def __init__(self, study_column="Study", truth_column="Human", model_columns=tuple(STAGE_COLUMNS)):
+        self.study_column = study_column
+        self.truth_column = truth_column
+        self.model_columns = tuple(model_columns)
+        self.study_index = {}
+        self.counts = np.zeros((0, len(self.model_columns), 2, len(LABELS)), dtype=np.int64)
+        # Paired (human, first model, second model) counts for the bootstrap difference intervals
+        self.joint = np.zeros((0, 2, len(LABELS), len(LABELS)), dtype=np.int64)
+        self.records = 0
+
+    # Function to add one chunk of decisions to the running counts
+    def add(self, decisions):
+        studies, counts = decision_counts(decisions, self.study_column, self.truth_column, self.model_columns)
+        rows = [self.study_index.setdefault(study, len(self.study_index)) for study in studies]
+        self.counts = self._grow(self.counts)
+        self.counts[rows] += counts
+        if len(self.model_columns) == 2:
+            self.joint = self._grow(self.joint)
+            self.joint[rows] += joint_counts(decisions, self.study_column, self.truth_column, self.model_columns)[1]
+        self.records += len(decisions)
+
+    # Function to pad a per-study count array with zero rows for newly seen studies
+    def _grow(self, counts):
+        if len(self.study_index) == len(counts):
+            return counts
+        grown = np.zeros((len(self.study_index),) + counts.shape[1:], dtype=np.int64)
+        grown[:len(counts)] = counts
+        return grown
+
+    # Function to get the study names in first-seen order
+    def studies(self):
+        return list(self.study_index)
+
+    # Function to lay the counts out as the confusion_data.csv table consumed by load_confusion_data
+    def confusion_frame(self):
+        return confusion_frame(self.studies(), self.counts, self.model_columns)
+
+    # Function to compute the metrics_data.csv table from the accumulated counts, optionally with paired bootstrap intervals
+    def metrics_frame(self, intervals=False, average="weighted", **kwargs):
+        frame = metrics_frame(self.studies(), compute_metrics(*binary_counts(self.counts), average=average), self.model_columns)
+        if intervals:
+            frame = frame.merge(interval_frame(self.studies(), bootstrap_intervals(self.joint, paired=True, average=average, **kwargs)), on=["Study", "Metric"], how="left")
+        return frame
+
+# Function to stream one or more decision logs into a ConfusionAccumulator
+def ingest_decision_logs(paths, chunksize=CHUNK_SIZE, study_column="Study", truth_column="Human", model_columns=tuple(STAGE_COLUMNS)):
+    accumulator = ConfusionAccumulator(study_column, truth_column, model_columns)
+    columns = [study_column, truth_column, *model_columns]
+    for path in paths:
+        for chunk in read_decision_chunks(path, columns, chunksize):
+            accumulator.add(chunk)
+    return accumulator
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate screening decision logs into confusion_data.csv and metrics_data.csv")
+    parser.add_argument("logs", nargs="+", help="CSV or JSONL decision logs with Study, Human, GPT-3.5 and GPT-4o columns")
+    parser.add_argument("--confusion-out", default="confusion_data.csv")
+    parser.add_argument("--metrics-out", default=None)
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--intervals", action="store_true", help="add bootstrap confidence interval columns to the metrics table")
+    parser.add_argument("--resamples", type=int, default=RESAMPLES)
+    args = parser.parse_args()
+
+    accumulator = ingest_decision_logs(args.logs, chunksize=args.chunksize)
+    accumulator.confusion_frame().to_csv(args.confusion_out, index=False)
+    if args.metrics_out:
+        accumulator.metrics_frame(intervals=args.intervals, resamples=args.resamples).to_csv(args.metrics_out, index=False)
+    print(f"Ingested {accumulator.records} decisions across {len(accumulator.study_index)} studies")
+
+if __name__ == "__main__":
+    main()
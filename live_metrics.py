@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from ingestion import STAGE_COLUMNS, ConfusionAccumulator
+
+# Default seconds between polls of the decision log on the live monitoring page
+LIVE_REFRESH_SECONDS = 5
+
+# Class to keep confusion counters in step with a growing JSONL decision log (the screening checkpoint)
+# Each poll reads only the bytes appended since the last one, so a decision is parsed and counted once. The counters and
+# the log offset are saved next to the log, so a restarted dashboard resumes where it stopped instead of re-reading the run.
+class LiveCounters:
+    def __init__(self, log_path, state_path=None, study_column="Study", truth_column="Human", model_columns=tuple(STAGE_COLUMNS)):
+        self.log_path = log_path
+        self.state_path = state_path or f"{log_path}.counters.json"
+        self.columns = [study_column, truth_column, *model_columns]
+        self.accumulator = ConfusionAccumulator(study_column, truth_column, model_columns)
+        self.offset = 0
+        self._lock = threading.Lock()
+        self.load()
+
+    # Function to restore the counters and log offset saved by a previous run
+    def load(self):
+        if not os.path.exists(self.state_path):
+            return
+        with open(self.state_path) as f:
+            state = json.load(f)
+        if state["log_path"] != os.path.abspath(self.log_path) or state["offset"] > self._log_size():
+            return
+        self.accumulator.study_index = {study: i for i, study in enumerate(state["studies"])}
+        self.accumulator.counts = np.array(state["counts"], dtype=np.int64).reshape((-1,) + self.accumulator.counts.shape[1:])
+        self.accumulator.joint = np.array(state["joint"], dtype=np.int64).reshape((-1,) + self.accumulator.joint.shape[1:])
+        self.accumulator.records = state["records"]
+        self.offset = state["offset"]
+
+    # Function to save the counters and log offset, replacing the previous state atomically
+    def save(self):
+        state = {
+            "log_path": os.path.abspath(self.log_path),
+            "offset": self.offset,
+            "records": self.accumulator.records,
+            "studies": self.accumulator.studies(),
+            "counts": self.accumulator.counts.tolist(),
+            "joint": self.accumulator.joint.tolist(),
+        }
+        with open(f"{self.state_path}.tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(f"{self.state_path}.tmp", self.state_path)
+
+    def _log_size(self):
+        return os.path.getsize(self.log_path) if os.path.exists(self.log_path) else 0
+
+    # Function to count the decisions appended to the log since the last poll and return how many were added
+    # A trailing line without a newline is still being written and is left for the next poll. Unlabelled records are skipped.
+    def update(self):
+        with self._lock:
+            if self._log_size() < self.offset:
+                # The log was truncated or replaced, so the counters no longer describe it
+                self.accumulator = ConfusionAccumulator(self.accumulator.study_column, self.accumulator.truth_column, self.accumulator.model_columns)
+                self.offset = 0
+            if self._log_size() == self.offset:
+                return 0
+            with open(self.log_path, "rb") as f:
+                f.seek(self.offset)
+                data = f.read()
+            complete = data[:data.rfind(b"\n") + 1]
+            if not complete:
+                return 0
+            rows = [json.loads(line) for line in complete.splitlines() if line.strip()]
+            decisions = pd.DataFrame(rows).reindex(columns=self.columns)
+            decisions = decisions[decisions[self.accumulator.truth_column].notna()]
+            if len(decisions):
+                self.accumulator.add(decisions)
+            self.offset += len(complete)
+            self.save()
+            return len(decisions)
+
+    # Function to get the current confusion_data.csv table
+    def confusion_frame(self):
+        with self._lock:
+            return self.accumulator.confusion_frame()
+
+    # Function to get the current metrics_data.csv table
+    def metrics_frame(self, **kwargs):
+        with self._lock:
+            return self.accumulator.metrics_frame(**kwargs)
@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+# Screening decision labels, in the order used by the confusion matrix tables
+LABELS = ["Include", "Insufficient Information", "Exclude"]
+
+# Decision column of each model and the metrics_data.csv column its averages are written to
+MODEL_COLUMNS = {"GPT-3.5": "GPT-3.5 Average", "GPT-4o": "GPT-4 Average"}
+
+# Model decisions that send a record forward to full-text review count as positive predictions
+POSITIVE_LABELS = ("Include", "Insufficient Information")
+
+# Metrics shown on the dashboard, in display order, with their card descriptions
+METRIC_DESCRIPTIONS = {
+    "Recall": "Essential for ensuring all relevant studies are identified.",
+    "Precision": "Ensures the identified studies are truly relevant.",
+    "F1 Score": "Balances recall and precision.",
+    "Specificity": "Correctly identifies non-relevant studies.",
+    "Accuracy": "Overall correctness of the model's predictions.",
+}
+METRICS = list(METRIC_DESCRIPTIONS)
+
+# Function to count decisions per (study, model, human label, model label) in one vectorized pass
+# Returns the study names and an int64 array of shape (studies, models, 2, 3); the human axis is (Include, Exclude)
+# and the model axis follows LABELS. Records with a label outside LABELS are ignored for that model, and records
+# without a Human label (not yet screened by a reviewer) are left out entirely.
+def decision_counts(decisions, study_column="Study", truth_column="Human", model_columns=tuple(MODEL_COLUMNS)):
+    study_codes, studies = pd.factorize(decisions[study_column], sort=False)
+    truth_codes = np.where(decisions[truth_column].to_numpy() == "Include", 0, 1)
+    label_codes = np.stack([pd.Categorical(decisions[column], categories=LABELS).codes for column in model_columns])
+    model_codes = np.arange(len(model_columns))[:, None]
+
+    valid = (label_codes >= 0) & (study_codes >= 0) & decisions[truth_column].notna().to_numpy()
+    flat = ((study_codes * len(model_columns) + model_codes) * 2 + truth_codes) * len(LABELS) + label_codes
+    counts = np.bincount(flat[valid], minlength=len(studies) * len(model_columns) * 2 * len(LABELS))
+    return list(studies), counts.reshape(len(studies), len(model_columns), 2, len(LABELS))
+
+# Function to collapse decision counts into binary tp/fp/fn/tn arrays of shape (studies, models)
+def binary_counts(counts, positive_labels=POSITIVE_LABELS):
+    positive = np.isin(LABELS, positive_labels)
+    predicted_positive = counts[..., positive].sum(axis=-1)
+    predicted_negative = counts[..., ~positive].sum(axis=-1)
+    return predicted_positive[..., 0], predicted_positive[..., 1], predicted_negative[..., 0], predicted_negative[..., 1]
+
+# Function to divide element-wise, returning 0 where the denominator is 0
+def safe_ratio(numerator, denominator):
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    return np.divide(numerator, denominator, out=np.zeros(np.broadcast(numerator, denominator).shape), where=denominator > 0)
+
+# Function to compute per-class recall, precision, F1 and specificity from binary counts
+def class_metrics(tp, fp, fn, tn):
+    recall = safe_ratio(tp, tp + fn)
+    precision = safe_ratio(tp, tp + fp)
+    return {
+        "Recall": recall,
+        "Precision": precision,
+        "F1 Score": safe_ratio(2 * precision * recall, precision + recall),
+        "Specificity": safe_ratio(tn, tn + fp),
+    }
+
+# Function to compute every dashboard metric from binary counts
+# "weighted" averages the Include and Exclude classes by support (the "Average" columns); "binary" scores the Include class only
+def compute_metrics(tp, fp, fn, tn, average="weighted"):
+    total = tp + fp + fn + tn
+    positive = class_metrics(tp, fp, fn, tn)
+    if average == "binary":
+        metrics = positive
+    elif average == "weighted":
+        negative = class_metrics(tn, fn, fp, tp)
+        positive_weight = safe_ratio(tp + fn, total)
+        negative_weight = safe_ratio(tn + fp, total)
+        metrics = {name: positive_weight * positive[name] + negative_weight * negative[name] for name in positive}
+    else:
+        raise ValueError(f"Unknown average: {average}")
+    metrics["Accuracy"] = safe_ratio(tp + tn, total)
+    return metrics
+
+# Function to format the relative change between two models as the "Improvement" column
+def improvement_labels(baseline, improved):
+    change = 100 * safe_ratio(np.asarray(improved) - np.asarray(baseline), baseline)
+    return [f"{value:+.2f}%" for value in change]
+
+# Function to lay computed metrics out in the metrics_data.csv schema
+def metrics_frame(studies, metrics, model_columns=tuple(MODEL_COLUMNS)):
+    values = np.stack([metrics[name] for name in METRICS], axis=1)
+    frame = pd.DataFrame({"Study": np.repeat(studies, len(METRICS)), "Metric": np.tile(METRICS, len(studies))})
+    for i, column in enumerate(model_columns):
+        frame[MODEL_COLUMNS[column]] = values[:, :, i].ravel().round(4)
+    frame["Improvement"] = improvement_labels(values[:, :, 0].ravel(), values[:, :, -1].ravel())
+    frame["Description"] = frame["Metric"].map(METRIC_DESCRIPTIONS)
+    return frame
+
+# Function to compute the metrics_data table from per-record screening decisions
+def metrics_from_decisions(decisions, study_column="Study", truth_column="Human", model_columns=tuple(MODEL_COLUMNS), positive_labels=POSITIVE_LABELS, average="weighted"):
+    studies, counts = decision_counts(decisions, study_column, truth_column, model_columns)
+    return metrics_frame(studies, compute_metrics(*binary_counts(counts, positive_labels), average=average), model_columns)
@@ -0,0 +1,68 @@
+# Local stand-in for an OpenAI-compatible chat completions endpoint, for exercising screening.py without real model calls
+#
+#   python mock_llm_server.py --port 8000 --latency 0.2 --failure-rate 0.05
+#   python screening.py records.csv --criteria criteria.txt --base-url http://127.0.0.1:8000/v1
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from metrics_engine import LABELS
+
+# Function to pick a deterministic decision and confidence for a (model, prompt) pair, so repeated runs agree
+def mock_decision(model, prompt):
+    digest = hashlib.sha1(f"{model}\0{prompt}".encode()).digest()
+    return f"{LABELS[digest[0] % len(LABELS)]}\nConfidence: {0.5 + digest[1] / 510:.2f}"
+
+# Function to create a mock server; requests wait `latency` seconds and fail with HTTP 429 at `failure_rate`
+def create_mock_server(host="127.0.0.1", port=0, latency=0.0, failure_rate=0.0):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            time.sleep(latency)
+            if random.random() < failure_rate:
+                self.send_response(429)
+                self.end_headers()
+                return
+            with server.lock:
+                server.requests += 1
+            decision = mock_decision(request["model"], request["messages"][-1]["content"])
+            body = json.dumps({"choices": [{"message": {"role": "assistant", "content": decision}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.lock = threading.Lock()
+    server.requests = 0
+    return server
+
+# Function to start a mock server on a background thread and return it with its base URL
+def start_mock_server(**kwargs):
+    server = create_mock_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}/v1"
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock OpenAI-compatible chat completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = create_mock_server(args.host, args.port, args.latency, args.failure_rate)
+    print(f"Mock LLM server on http://{args.host}:{args.port}/v1")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
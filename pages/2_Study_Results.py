@@ -0,0 +1,31 @@
+# pages/2_Study_Results.py
+# One page for every study: the study list comes from the metrics data and only the selected study's rows are loaded,
+# so adding a review adds a selector entry and nothing else. Link to a study with ?study=<name>.
+import os
+import streamlit as st
+from perf_instrumentation import start_rerun, finish_rerun
+from query_store import DECISION_STORE_FILE
+from utils import load_query_repository, load_study_names, resolve_data_file, render_study_page, create_study_page, batched_cards_setting
+
+st.set_page_config(page_title="Study Results", page_icon="📄", layout="wide")
+
+# Start timing this rerun when DASHBOARD_PROFILE is set
+start_rerun()
+
+metrics_file = resolve_data_file("metrics_data")
+repository = load_query_repository(DECISION_STORE_FILE) if os.path.exists(DECISION_STORE_FILE) else None
+studies = repository.studies if repository is not None else load_study_names(metrics_file)
+
+# Preselect the study named in the query string, and keep the query string in step with the selection
+requested = st.experimental_get_query_params().get("study", [None])[0]
+study = st.sidebar.selectbox("Select a Study", studies, index=studies.index(requested) if requested in studies else 0)
+st.experimental_set_query_params(study=study)
+batched = batched_cards_setting()
+
+if repository is not None:
+    create_study_page(study, repository, batched=batched)
+else:
+    render_study_page(study, metrics_file, resolve_data_file("confusion_data"), resolve_data_file("recall_curves"), batched=batched, transitions_file=resolve_data_file("transition_data"), thresholds_file=resolve_data_file("threshold_curves"))
+
+# Show and export the rerun's timings when profiling
+finish_rerun()
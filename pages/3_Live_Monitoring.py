@@ -0,0 +1,15 @@
+# pages/3_Live_Monitoring.py
+import os
+import streamlit as st
+from perf_instrumentation import start_rerun
+from utils import live_counters, create_live_page
+
+st.set_page_config(page_title="Live Monitoring", page_icon="📈", layout="wide")
+
+# Start timing this rerun when DASHBOARD_PROFILE is set; create_live_page finishes it once the first poll is drawn
+start_rerun()
+
+# Watch the decision log a screening run is appending to (screening.py --output)
+log_path = st.sidebar.text_input("Decision log", os.environ.get("DASHBOARD_LIVE_LOG", "decisions.jsonl"))
+
+create_live_page(live_counters(os.path.abspath(log_path)))
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+from metrics_engine import METRICS, MODEL_COLUMNS
+
+# Number of studies above which the comparison summary is aggregated per Metric and Model before it is sent
+AGGREGATE_STUDIES_THRESHOLD = 20
+
+# Model averages plotted by the metric charts, in legend order
+VALUE_COLUMNS = list(MODEL_COLUMNS.values())
+
+# Function to reshape metrics rows into the long (Metric, Model, Value) frame the Vega-Lite charts encode
+# Only the encoded fields are kept: labels become categoricals (sent once per chart as an Arrow dictionary) and values float32.
+# With intervals=True the bootstrap bounds of each model are kept as Lower and Upper.
+def metric_long_frame(metrics_data, keep_study=False, intervals=False):
+    frame = pd.DataFrame({
+        "Metric": pd.Categorical(np.tile(metrics_data["Metric"].to_numpy(), len(VALUE_COLUMNS))),
+        "Model": pd.Categorical.from_codes(np.repeat(np.arange(len(VALUE_COLUMNS)), len(metrics_data)), categories=VALUE_COLUMNS),
+        "Value": pd.concat([metrics_data[column] for column in VALUE_COLUMNS], ignore_index=True).astype("float32"),
+    })
+    if keep_study:
+        frame.insert(0, "Study", pd.Categorical(np.tile(metrics_data["Study"].to_numpy(), len(VALUE_COLUMNS))))
+    if intervals:
+        frame["Lower"] = pd.concat([metrics_data[column.replace("Average", "Lower")] for column in VALUE_COLUMNS], ignore_index=True).astype("float32")
+        frame["Upper"] = pd.concat([metrics_data[column.replace("Average", "Upper")] for column in VALUE_COLUMNS], ignore_index=True).astype("float32")
+    return frame
+
+# Function to aggregate a long metric frame to mean, min and max Value per Metric and Model across studies
+def aggregate_metric_frame(frame):
+    aggregated = frame.groupby(["Metric", "Model"], observed=True, sort=True)["Value"].agg(Mean="mean", Min="min", Max="max", Studies="size")
+    return aggregated.reset_index().astype({"Mean": "float32", "Min": "float32", "Max": "float32"})
+
+# Function to shape the comparison summary payload; aggregates server-side when there are more studies than the threshold
+# Returns the frame and whether it was aggregated, which selects the chart spec.
+def comparison_payload(metrics_data, threshold=AGGREGATE_STUDIES_THRESHOLD):
+    frame = metric_long_frame(metrics_data)
+    if metrics_data["Study"].nunique() > threshold:
+        return aggregate_metric_frame(frame), True
+    return frame, False
+
+# Function to get the comparison summary spec: mean bar per Metric and Model with a min-max rule across studies
+def comparison_chart_spec(aggregated):
+    if aggregated:
+        y, low, high = {'field': 'Mean'}, {'field': 'Min'}, {'field': 'Max'}
+    else:
+        y, low, high = {'field': 'Value', 'aggregate': 'mean'}, {'field': 'Value', 'aggregate': 'min'}, {'field': 'Value', 'aggregate': 'max'}
+    return {
+        'encoding': {
+            'x': {'field': 'Metric', 'type': 'ordinal', 'sort': METRICS},
+            'xOffset': {'field': 'Model'},
+            'color': {'field': 'Model'},
+        },
+        'layer': [
+            {'mark': {'type': 'bar', 'tooltip': True, 'cornerRadiusEnd': 4}, 'encoding': {'y': {**y, 'type': 'quantitative', 'title': 'Value', 'format': '.4f', 'axis': {'grid': False}}}},
+            {'mark': {'type': 'rule', 'color': 'gray'}, 'encoding': {'y': {**low, 'type': 'quantitative'}, 'y2': high}},
+        ],
+    }
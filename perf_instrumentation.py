@@ -0,0 +1,154 @@
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+import pandas as pd
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# Environment variable that turns instrumentation on (any value other than empty or "0")
+PROFILE_ENV_VAR = "DASHBOARD_PROFILE"
+
+# Environment variable naming a JSON lines file that receives one record per profiled rerun
+PROFILE_LOG_ENV_VAR = "DASHBOARD_PROFILE_LOG"
+
+# Each Streamlit session runs its script in its own thread, so the active profile is thread-local
+_local = threading.local()
+_log_lock = threading.Lock()
+
+# Function to check whether instrumentation is turned on
+def is_enabled():
+    return os.environ.get(PROFILE_ENV_VAR, "") not in ("", "0")
+
+# Class to collect the timed spans and payload bytes of one script rerun
+class RerunProfile:
+    def __init__(self, session_id=None):
+        self.session_id = session_id
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+        self.payload_bytes = 0
+        self.messages = 0
+        self.records = []
+        self.stack = []
+
+    # Function to attribute an outgoing message to the rerun and to every span that is currently open
+    def add_message(self, msg):
+        size = msg.ByteSize()
+        self.messages += 1
+        self.payload_bytes += size
+        for record in self.stack:
+            record["payload_bytes"] += size
+
+    # Function to aggregate the spans per name: call count, total/max wall time and payload bytes
+    def summary(self):
+        if not self.records:
+            return pd.DataFrame(columns=["name", "calls", "total_ms", "max_ms", "payload_bytes"])
+        df = pd.DataFrame(self.records)
+        df["ms"] = 1000 * df["seconds"]
+        summary = df.groupby("name", sort=False).agg(calls=("ms", "size"), total_ms=("ms", "sum"), max_ms=("ms", "max"), payload_bytes=("payload_bytes", "sum"))
+        return summary.sort_values("total_ms", ascending=False).reset_index().round(2)
+
+    # Function to get a JSON-serializable record of the rerun
+    def to_record(self):
+        return {
+            "timestamp": self.started_at,
+            "session_id": self.session_id,
+            "seconds": round(self.seconds, 6),
+            "messages": self.messages,
+            "payload_bytes": self.payload_bytes,
+            "calls": [{**record, "seconds": round(record["seconds"], 6)} for record in self.records],
+        }
+
+# Function to get the profile of the current rerun, or None when it is not being profiled
+def current_profile():
+    return getattr(_local, "profile", None)
+
+# Function to route the session's outgoing messages through the active profile so payload sizes can be counted
+def _install_enqueue_hook(ctx):
+    if getattr(ctx, "_profile_hooked", False):
+        return
+    enqueue = ctx._enqueue
+
+    def profiled_enqueue(msg):
+        profile = current_profile()
+        if profile is not None:
+            profile.add_message(msg)
+        enqueue(msg)
+
+    ctx._enqueue = profiled_enqueue
+    ctx._profile_hooked = True
+
+# Function to start profiling a rerun; does nothing unless instrumentation is enabled
+def start_rerun():
+    _local.profile = None
+    if not is_enabled():
+        return None
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        _install_enqueue_hook(ctx)
+    _local.profile = RerunProfile(ctx.session_id if ctx is not None else None)
+    return _local.profile
+
+# Context manager to time a block as a named span of the current rerun
+@contextlib.contextmanager
+def span(name):
+    profile = current_profile()
+    if profile is None:
+        yield
+        return
+    record = {"name": name, "seconds": 0.0, "payload_bytes": 0}
+    profile.stack.append(record)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        profile.stack.pop()
+        profile.records.append(record)
+
+# Decorator to time every call of a function as a span named after it
+def timed(name=None):
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_profile() is None:
+                return func(*args, **kwargs)
+            with span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Function to append a profile to the JSON lines log named by PROFILE_LOG_ENV_VAR, if any
+def export_jsonl(profile, path=None):
+    path = path or os.environ.get(PROFILE_LOG_ENV_VAR)
+    if not path:
+        return
+    line = json.dumps(profile.to_record())
+    with _log_lock, open(path, "a") as f:
+        f.write(line + "\n")
+
+# Function to show a profile in a sidebar debug panel
+def render_panel(profile):
+    from figure_cache import FIGURE_CACHE
+
+    with st.sidebar.expander("Performance", expanded=False):
+        st.caption(f"Rerun: {1000 * profile.seconds:.1f} ms, {profile.messages} messages, {profile.payload_bytes / 1024:.1f} KiB")
+        st.dataframe(profile.summary(), hide_index=True, use_container_width=True)
+        st.caption("Figure cache")
+        st.json(FIGURE_CACHE.stats())
+
+# Function to stop profiling the current rerun, then show and export its measurements
+def finish_rerun():
+    profile = current_profile()
+    if profile is None:
+        return None
+    profile.seconds = time.perf_counter() - profile.start
+    _local.profile = None
+    export_jsonl(profile)
+    render_panel(profile)
+    return profile
@@ -0,0 +1,131 @@
+import argparse
+import json
+import re
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+# BM25 term-frequency saturation and document-length normalization parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Words too common in titles/abstracts and criteria to help ranking
+STOPWORDS = frozenset("a an and are as at be by for from has have in is it its of on or that the this to was were with we our their which".split())
+
+# Number of points each study's recall curve is resampled to for the dashboard
+RECALL_CURVE_POINTS = 101
+
+# Function to split text into lowercase word tokens, dropping stopwords and single characters
+def tokenize(text):
+    return [token for token in re.findall(r"\w+", str(text).lower()) if len(token) > 1 and token not in STOPWORDS]
+
+# Class to hold a BM25-weighted document-term matrix over record texts and score queries against it
+class LexicalIndex:
+    def __init__(self, weights, vocabulary):
+        self.weights = weights
+        self.vocabulary = vocabulary
+
+    # Function to build the index from record texts
+    @classmethod
+    def build(cls, texts, k1=BM25_K1, b=BM25_B):
+        tokens = [tokenize(text) for text in texts]
+        lengths = np.array([len(doc) for doc in tokens])
+        term_ids, terms = pd.factorize(pd.Series([token for doc in tokens for token in doc], dtype=object))
+        doc_ids = np.repeat(np.arange(len(tokens)), lengths)
+        counts = sp.csr_matrix((np.ones(len(term_ids)), (doc_ids, term_ids)), shape=(len(tokens), len(terms)))
+        counts.sum_duplicates()
+
+        document_frequency = np.bincount(counts.indices, minlength=len(terms))
+        idf = np.log1p((len(tokens) - document_frequency + 0.5) / (document_frequency + 0.5))
+        row_lengths = np.repeat(lengths / max(lengths.mean(), 1), np.diff(counts.indptr))
+        tf = counts.data
+        counts.data = idf[counts.indices] * tf * (k1 + 1) / (tf + k1 * (1 - b + b * row_lengths))
+        return cls(counts, {term: i for i, term in enumerate(terms)})
+
+    # Function to score every record against a query such as the review's eligibility criteria
+    def score(self, query):
+        term_ids = [self.vocabulary[token] for token in tokenize(query) if token in self.vocabulary]
+        query_vector = np.bincount(np.asarray(term_ids, dtype=np.int64), minlength=len(self.vocabulary)).astype(float)
+        return self.weights @ query_vector
+
+    # Function to save the index as a sparse matrix (.npz) with its vocabulary (.vocab.json)
+    def save(self, path):
+        sp.save_npz(f"{path}.npz", self.weights)
+        with open(f"{path}.vocab.json", "w") as f:
+            json.dump(list(self.vocabulary), f)
+
+    # Function to load an index saved with save()
+    @classmethod
+    def load(cls, path):
+        with open(f"{path}.vocab.json") as f:
+            terms = json.load(f)
+        return cls(sp.load_npz(f"{path}.npz").tocsr(), {term: i for i, term in enumerate(terms)})
+
+# Function to compute recall against the fraction of records screened when screening in descending score order
+def recall_curve(scores, included):
+    order = np.argsort(-np.asarray(scores), kind="stable")
+    found = np.cumsum(np.asarray(included, dtype=bool)[order])
+    fraction = np.arange(1, len(order) + 1) / len(order)
+    recall = found / found[-1] if len(found) and found[-1] else np.zeros(len(order))
+    return fraction, recall
+
+# Function to find the smallest fraction of records that reaches the target recall on labelled records, widened by a safety margin
+def recall_safe_fraction(scores, included, target_recall=0.95, margin=0.05):
+    fraction, recall = recall_curve(scores, included)
+    if not len(fraction):
+        return 1.0
+    reached = fraction[min(np.searchsorted(recall, target_recall), len(fraction) - 1)]
+    return min(1.0, reached + margin)
+
+# Function to order records by BM25 score against the criteria, optionally keeping only a recall-safe prefix
+def prioritize(records, criteria, target_recall=None, margin=0.05):
+    texts = (records["Title"].fillna("").astype(str) + " " + records["Abstract"].fillna("").astype(str)).tolist()
+    ranked = records.assign(**{"Priority Score": LexicalIndex.build(texts).score(criteria)})
+    ranked = ranked.sort_values(["Study", "Priority Score"], ascending=[True, False], kind="stable")
+    if target_recall is None:
+        return ranked
+    return apply_recall_cutoff(ranked, target_recall, margin)
+
+# Function to keep, per study, the recall-safe prefix of ranked records, calibrated on the records that have Human labels
+def apply_recall_cutoff(ranked, target_recall=0.95, margin=0.05):
+    if "Human" not in ranked:
+        return ranked
+    kept = []
+    for _, df_study in ranked.groupby("Study", sort=False):
+        labelled = df_study[df_study["Human"].notna()]
+        fraction = recall_safe_fraction(labelled["Priority Score"], labelled["Human"] == "Include", target_recall, margin) if len(labelled) else 1.0
+        kept.append(df_study.iloc[:int(np.ceil(fraction * len(df_study)))])
+    return pd.concat(kept)
+
+# Function to build the per-study recall curves shown on the dashboard from ranked, labelled records
+def recall_curves(ranked, points=RECALL_CURVE_POINTS):
+    grid = np.linspace(0, 1, points)
+    curves = []
+    for study, df_study in ranked[ranked["Human"].notna()].groupby("Study", sort=False):
+        fraction, recall = recall_curve(df_study["Priority Score"], df_study["Human"] == "Include")
+        curves.append(pd.DataFrame({"Study": study, "Fraction Screened": grid.round(4), "Recall": np.interp(grid, np.r_[0, fraction], np.r_[0, recall]).round(4)}))
+    return pd.concat(curves, ignore_index=True) if curves else pd.DataFrame(columns=["Study", "Fraction Screened", "Recall"])
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank title/abstract records against the eligibility criteria before screening")
+    parser.add_argument("records", help="CSV with Study, record_id, Title, Abstract and optionally Human columns")
+    parser.add_argument("--criteria", required=True, help="text file with the eligibility criteria")
+    parser.add_argument("--output", required=True, help="CSV of records in screening order")
+    parser.add_argument("--target-recall", type=float, default=None, help="keep only the recall-safe prefix calibrated on labelled records")
+    parser.add_argument("--margin", type=float, default=0.05, help="extra fraction of records kept beyond the calibrated cutoff")
+    parser.add_argument("--curves", default=None, help="write recall vs. fraction screened per study (e.g. recall_curves.csv for the dashboard)")
+    args = parser.parse_args()
+
+    with open(args.criteria) as f:
+        criteria = f.read()
+    records = pd.read_csv(args.records, dtype={"record_id": str})
+    ranked = prioritize(records, criteria)
+    if args.curves and "Human" in ranked:
+        recall_curves(ranked).to_csv(args.curves, index=False)
+    if args.target_recall is not None:
+        ranked = apply_recall_cutoff(ranked, args.target_recall, args.margin)
+    ranked.to_csv(args.output, index=False)
+    print(f"Wrote {len(ranked)} of {len(records)} records in priority order to {args.output}")
+
+if __name__ == "__main__":
+    main()
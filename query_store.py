@@ -0,0 +1,223 @@
+import argparse
+import sqlite3
+import threading
+import numpy as np
+from metrics_engine import LABELS, binary_counts, compute_metrics, metrics_frame
+from agreement import agreement_frame
+from ingestion import CHUNK_SIZE, STAGE_COLUMNS, confusion_frame, read_decision_chunks
+
+# Default decision store the dashboard reads when it exists
+DECISION_STORE_FILE = "decisions.sqlite"
+
+# One row per (record, model) decision, so Study, Model and Category filters are plain indexed equality predicates
+# The (study, record_id, model) key keeps re-imports of the append-only screening log from duplicating decisions;
+# its index also serves the record_id self-join of TRANSITIONS_SQL.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS decisions (
+    study TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    human TEXT,
+    model TEXT NOT NULL,
+    label TEXT,
+    UNIQUE (study, record_id, model)
+);
+CREATE INDEX IF NOT EXISTS decisions_study_model_label ON decisions (study, model, label);
+"""
+
+# Stores a decision, or updates the labels of one already stored so the latest log entry wins; the row keeps its rowid
+INSERT_SQL = """
+INSERT INTO decisions VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (study, record_id, model) DO UPDATE SET human = excluded.human, label = excluded.label
+"""
+
+# Studies in the order their first decision was stored
+STUDIES_SQL = "SELECT study FROM decisions GROUP BY study ORDER BY MIN(rowid)"
+
+# Decision counts per (study, model, human label block, model label); unlabelled records are left out
+COUNTS_SQL = """
+SELECT study, model, CASE human WHEN 'Include' THEN 0 ELSE 1 END AS truth, label, COUNT(*)
+FROM decisions
+WHERE human IS NOT NULL{filters}
+GROUP BY study, model, truth, label
+"""
+
+# Transition counts between two models' labels of the same record, per study (self-join on study and record_id)
+TRANSITIONS_SQL = """
+SELECT first.study, first.label, second.label, COUNT(*)
+FROM decisions AS first
+JOIN decisions AS second ON second.study = first.study AND second.record_id = first.record_id AND second.model = ?
+WHERE first.model = ?{filters}
+GROUP BY first.study, first.label, second.label
+"""
+
+# Number of statements sqlite3 keeps compiled on the connection; each filter combination is one statement text
+STATEMENT_CACHE_SIZE = 64
+
+# Class to query a SQLite decision store through one shared connection, pushing filters and aggregation into SQL
+# Query results are memoized until the database changes (PRAGMA data_version or writes through this connection).
+class DecisionStore:
+    def __init__(self, path, model_columns=tuple(STAGE_COLUMNS)):
+        self.path = path
+        self.model_columns = tuple(model_columns)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE)
+        self._conn.executescript(SCHEMA)
+        self._results = {}
+        self._version = None
+
+    # Function to store decisions from a DataFrame with Study, record_id, Human and one column per model
+    def add_decisions(self, decisions, study_column="Study", truth_column="Human"):
+        rows = []
+        for column in self.model_columns:
+            part = decisions[[study_column, "record_id", truth_column, column]]
+            part = part.astype(object).where(part.notna(), None)
+            rows.extend((study, record_id, human, column, label) for study, record_id, human, label in part.itertuples(index=False))
+        with self._lock:
+            self._conn.executemany(INSERT_SQL, rows)
+            self._conn.commit()
+        return len(rows)
+
+    # Function to run a query, or return its memoized result when the database has not changed since
+    def _query(self, sql, params=()):
+        with self._lock:
+            version = (self._conn.execute("PRAGMA data_version").fetchone()[0], self._conn.total_changes)
+            if version != self._version:
+                self._results.clear()
+                self._version = version
+            key = (sql, params)
+            if key not in self._results:
+                self._results[key] = self._conn.execute(sql, params).fetchall()
+            return self._results[key]
+
+    # Function to count the decisions in the store
+    def decision_count(self):
+        return self._query("SELECT COUNT(*) FROM decisions")[0][0]
+
+    # Function to list the studies in the store
+    def studies(self):
+        return [study for (study,) in self._query(STUDIES_SQL)]
+
+    # Function to aggregate decision counts in SQL for the given studies, models and model label
+    # Returns the study names and an int64 array of shape (studies, models, 2, 3) as metrics_engine.decision_counts does.
+    def counts(self, studies=None, models=None, label=None):
+        models = tuple(models or self.model_columns)
+        filters, params = "", []
+        if studies is not None:
+            filters += f" AND study IN ({', '.join('?' * len(studies))})"
+            params += list(studies)
+        filters += f" AND model IN ({', '.join('?' * len(models))})"
+        params += list(models)
+        if label is not None:
+            filters += " AND label = ?"
+            params.append(label)
+        rows = self._query(COUNTS_SQL.format(filters=filters), tuple(params))
+
+        names = list(studies) if studies is not None else self.studies()
+        study_index = {study: i for i, study in enumerate(names)}
+        model_index = {model: i for i, model in enumerate(models)}
+        counts = np.zeros((len(names), len(models), 2, len(LABELS)), dtype=np.int64)
+        for study, model, truth, row_label, count in rows:
+            if row_label in LABELS:
+                counts[study_index[study], model_index[model], truth, LABELS.index(row_label)] = count
+        return names, counts
+
+    # Function to compute the metrics_data.csv rows of the given studies (all by default) from SQL-aggregated counts
+    def metrics(self, studies=None, models=None, **kwargs):
+        names, counts = self.counts(studies, models)
+        return metrics_frame(names, compute_metrics(*binary_counts(counts), **kwargs), models or self.model_columns)
+
+    # Function to get the confusion_data.csv rows of one study, optionally only those of one Category (model label)
+    def confusion(self, study, category=None, models=None):
+        names, counts = self.counts([study], models, category)
+        frame = confusion_frame(names, counts, models or self.model_columns)
+        return frame if category is None else frame[frame["Category"] == category]
+
+    # Function to aggregate First Review x Evaluation Step transitions in SQL for the given studies (all by default)
+    # Returns the study names and an int64 array of shape (studies, 3, 3) as agreement.transition_counts does.
+    def transitions(self, studies=None, models=None):
+        first, second = tuple(models or self.model_columns)[:2]
+        filters, params = "", [second, first]
+        if studies is not None:
+            filters += f" AND first.study IN ({', '.join('?' * len(studies))})"
+            params += list(studies)
+        rows = self._query(TRANSITIONS_SQL.format(filters=filters), tuple(params))
+
+        names = list(studies) if studies is not None else self.studies()
+        study_index = {study: i for i, study in enumerate(names)}
+        transitions = np.zeros((len(names), len(LABELS), len(LABELS)), dtype=np.int64)
+        for study, first_label, second_label, count in rows:
+            if first_label in LABELS and second_label in LABELS:
+                transitions[study_index[study], LABELS.index(first_label), LABELS.index(second_label)] = count
+        return names, transitions
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# Class to serve the StudyRepository interface from a DecisionStore, so each page queries exactly the slice it draws
+class QueryRepository:
+    def __init__(self, store):
+        self.store = store
+
+    @property
+    def studies(self):
+        return self.store.studies()
+
+    # Function to get the metrics rows of one study
+    def metrics(self, study):
+        return self.store.metrics([study])
+
+    # Function to get the metric names of one study, in display order
+    def metric_names(self, study):
+        return self.metrics(study)["Metric"].tolist()
+
+    # Function to get the metric rows of one study keyed by metric name
+    def metric_rows(self, study):
+        return {row["Metric"]: row for row in self.metrics(study).to_dict("records")}
+
+    # Function to get the confusion rows of one study, optionally for a single category
+    def confusion(self, study, category=None):
+        return self.store.confusion(study, category)
+
+    # Function to get the combined metrics of the given studies (all studies by default)
+    def combined_metrics(self, studies=None):
+        return self.store.metrics(studies)
+
+    # Function to get the First Review x Evaluation Step transition counts of one study
+    def transitions(self, study):
+        return self.store.transitions([study])[1][0]
+
+    # Function to get the agreement row (kappas and agreement rates) of one study
+    def agreement(self, study):
+        return agreement_frame(*self.store.transitions([study])).to_dict("records")[0]
+
+    # Function to get the prioritization recall curve of one study; the decision store does not hold any
+    def recall_curve(self, study):
+        return None
+
+    # Function to get the threshold sweep curves of one study; the decision store holds labels, not confidence scores
+    def threshold_curve(self, study):
+        return None
+
+# Function to load CSV or JSONL decision logs into a decision store in chunks
+def import_decision_logs(store, paths, chunksize=CHUNK_SIZE):
+    stored = 0
+    for path in paths:
+        for chunk in read_decision_chunks(path, ["Study", "record_id", "Human", *store.model_columns], chunksize):
+            stored += store.add_decisions(chunk)
+    return stored
+
+def main():
+    parser = argparse.ArgumentParser(description="Load screening decision logs into the SQLite decision store read by the dashboard")
+    parser.add_argument("logs", nargs="+", help="CSV or JSONL decision logs with Study, record_id, Human, GPT-3.5 and GPT-4o columns")
+    parser.add_argument("--store", default=DECISION_STORE_FILE)
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    store = DecisionStore(args.store)
+    stored = import_decision_logs(store, args.logs, args.chunksize)
+    print(f"Read {stored} decisions; {args.store} holds {store.decision_count()} decisions across {len(store.studies())} studies")
+    store.close()
+
+if __name__ == "__main__":
+    main()
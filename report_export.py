@@ -0,0 +1,201 @@
+import argparse
+import hashlib
+import html
+import importlib.util
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from columnar_store import is_columnar
+from study_repository import StudyRepository
+
+# Bump when the report layout changes, so the next export rewrites every report instead of skipping unchanged inputs
+REPORT_VERSION = 1
+
+# Manifest written next to the reports: input hash, files and export time of every report
+MANIFEST_FILE = "manifest.json"
+
+# Plotly bundle written once into the report directory and shared by every report, so they open without network access
+PLOTLY_JS_FILE = "plotly.min.js"
+
+# Vega, Vega-Lite and vega-embed bundle (built by vl-convert) written once into the report directory, so the Vega-Lite
+# charts also render without network access
+VEGA_JS_FILE = "vega-embed.bundle.js"
+
+# Name of the comparison dashboard report in the manifest
+COMPARISON_REPORT = "Comparison Dashboard"
+
+# Function to read a CSV, Parquet or Arrow data file with pandas, outside the Streamlit caches
+def read_data_file(path):
+    if is_columnar(path):
+        from columnar_store import read_columnar
+        return read_columnar(path)
+    return pd.read_csv(path)
+
+# Function to turn a study name into a safe report file name
+def report_filename(name):
+    return re.sub(r"[^\w-]+", "_", name).strip("_") + ".html"
+
+# Function to assign each report a distinct file name; names that map to the same file get a numbered suffix
+def report_filenames(names):
+    filenames, taken = {}, set()
+    for name in names:
+        filename = report_filename(name)
+        stem, suffix = filename[:-len(".html")], 2
+        while filename.lower() in taken:
+            filename, suffix = f"{stem}_{suffix}.html", suffix + 1
+        taken.add(filename.lower())
+        filenames[name] = filename
+    return filenames
+
+# Function to hash the inputs of one report; the report is skipped on the next export while this stays the same
+def input_hash(*frames, png=False):
+    digest = hashlib.sha1(f"report-v{REPORT_VERSION}-png{int(png)}".encode())
+    for frame in frames:
+        digest.update(frame.to_csv(index=False).encode())
+    return digest.hexdigest()
+
+# Function to make a standalone Vega-Lite spec with the chart data inlined
+def vega_spec(data, spec, width="container"):
+    return {"$schema": "https://vega.github.io/schema/vega-lite/v5.json", "width": width, "data": {"values": json.loads(data.to_json(orient="records"))}, **spec}
+
+# Function to embed a Vega-Lite chart with its data inlined
+def vega_html(div_id, data, spec):
+    return f"<div id='{div_id}' style='width: 100%'></div><script>vegaEmbed('#{div_id}', {json.dumps(vega_spec(data, spec))}, {{actions: false}});</script>"
+
+# Function to embed a Plotly figure that uses the shared plotly.js bundle
+def plotly_html(fig):
+    return fig.to_html(full_html=False, include_plotlyjs=False)
+
+# Function to wrap report sections into a standalone page
+def report_page(title, sections):
+    scripts = "".join(f"<script src='{src}'></script>" for src in [PLOTLY_JS_FILE, VEGA_JS_FILE])
+    return f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>{scripts}</head><body style='font-family: sans-serif; max-width: 1100px; margin: auto'><h1>{html.escape(title)}</h1>{''.join(sections)}</body></html>"
+
+# Function to render one study report (bullet cards, metric chart and confusion matrices) into out_dir
+# Runs in a pool worker: charts are built with the same functions and specs as the dashboard page.
+def export_study_report(study, filename, metrics, confusion, out_dir, png=False):
+    from utils import create_bullet_chart, create_confusion_matrix, format_intervals, gpt4_interval, metric_chart_spec
+    repository = StudyRepository(metrics, confusion)
+    figures, sections = [], ["<h2>Performance Metrics</h2>"]
+    for metric, row in repository.metric_rows(study).items():
+        fig = create_bullet_chart(metric, [row["GPT-3.5 Average"], row["GPT-4 Average"]], f"{metric} Improvement", gpt4_interval(row))
+        figures.append((metric, fig))
+        intervals = format_intervals(row)
+        sections.append(plotly_html(fig) + f"<p style='color: gray'>{html.escape(row['Description'])}</p>" + (f"<p style='color: gray; font-size: 0.8em'>{html.escape(intervals)}</p>" if intervals else ""))
+    metric_chart = metric_chart_spec(repository.metrics(study))
+    sections.append("<h2>Confusion Matrix Analysis</h2>" + vega_html("metric_chart", *metric_chart))
+    for category, label in [("Include", "Included"), ("Exclude", "Excluded")]:
+        fig = create_confusion_matrix(repository.confusion(study, category), f"Confusion Matrix for {label} Studies")
+        figures.append((f"Confusion {label}", fig))
+        sections.append(plotly_html(fig))
+
+    with open(os.path.join(out_dir, filename), "w", encoding="utf-8") as f:
+        f.write(report_page(f"{study} Title and Abstract Screening Results", sections))
+    files = [filename]
+    if png:
+        import vl_convert
+        stem = filename[:-len(".html")]
+        for name, fig in figures:
+            image = f"{stem}_{report_filename(name)[:-len('.html')]}.png"
+            fig.write_image(os.path.join(out_dir, image))
+            files.append(image)
+        with open(os.path.join(out_dir, f"{stem}_Metric_Chart.png"), "wb") as f:
+            f.write(vl_convert.vegalite_to_png(vega_spec(*metric_chart, width=800)))
+        files.append(f"{stem}_Metric_Chart.png")
+    return study, files
+
+# Function to render the comparison dashboard report: the cross-study summary chart and links to every study report
+def export_comparison_report(metrics_data, filenames, out_dir):
+    from payload_shaping import comparison_chart_spec, comparison_payload
+    frame, aggregated = comparison_payload(metrics_data)
+    links = "".join(f"<li><a href='{filename}'>{html.escape(study)}</a></li>" for study, filename in filenames.items() if study != COMPARISON_REPORT)
+    sections = ["<h2>Summary of Metrics Across Studies</h2>", vega_html("comparison_chart", frame, comparison_chart_spec(aggregated)), f"<h2>Studies</h2><ul>{links}</ul>"]
+    filename = filenames[COMPARISON_REPORT]
+    with open(os.path.join(out_dir, filename), "w", encoding="utf-8") as f:
+        f.write(report_page(COMPARISON_REPORT, sections))
+    return COMPARISON_REPORT, [filename]
+
+# Function to load the manifest of a previous export, or an empty one
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {"reports": {}}
+    with open(path) as f:
+        return json.load(f)
+
+# Function to write the manifest atomically, so an interrupted export never leaves a half-written one
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_FILE)
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(f"{path}.tmp", path)
+
+# Function to export every study report and the comparison report, skipping those whose input hash is unchanged
+# Reports are rendered across a process pool; workers=1 renders them in this process.
+def export_reports(metrics_data, confusion_data, out_dir, workers=None, png=False, force=False):
+    os.makedirs(out_dir, exist_ok=True)
+    if not os.path.exists(os.path.join(out_dir, PLOTLY_JS_FILE)):
+        from plotly.offline import get_plotlyjs
+        with open(os.path.join(out_dir, PLOTLY_JS_FILE), "w", encoding="utf-8") as f:
+            f.write(get_plotlyjs())
+    if not os.path.exists(os.path.join(out_dir, VEGA_JS_FILE)):
+        import vl_convert
+        with open(os.path.join(out_dir, VEGA_JS_FILE), "w", encoding="utf-8") as f:
+            f.write(vl_convert.javascript_bundle())
+
+    repository = StudyRepository(metrics_data, confusion_data)
+    filenames = report_filenames([COMPARISON_REPORT, *repository.studies])
+    manifest = load_manifest(out_dir)
+    previous = manifest["reports"] if manifest.get("version") == REPORT_VERSION else {}
+
+    # Function to check whether a report's inputs and files are unchanged since the last export
+    def unchanged(name, digest):
+        entry = previous.get(name)
+        return not force and entry is not None and entry["hash"] == digest and entry["files"][0] == filenames[name] and all(os.path.exists(os.path.join(out_dir, file)) for file in entry["files"])
+
+    hashes, tasks = {}, []
+    for study in repository.studies:
+        metrics, confusion = repository.metrics(study), repository.confusion(study)
+        hashes[study] = input_hash(metrics, confusion, png=png)
+        if not unchanged(study, hashes[study]):
+            tasks.append((export_study_report, (study, filenames[study], metrics, confusion, out_dir, png)))
+    hashes[COMPARISON_REPORT] = input_hash(metrics_data, pd.DataFrame({"File": list(filenames.values())}))
+    if not unchanged(COMPARISON_REPORT, hashes[COMPARISON_REPORT]):
+        tasks.append((export_comparison_report, (metrics_data, filenames, out_dir)))
+
+    if workers == 1 or len(tasks) <= 1:
+        results = [function(*args) for function, args in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = [future.result() for future in [pool.submit(function, *args) for function, args in tasks]]
+
+    exported = time.strftime("%Y-%m-%dT%H:%M:%S")
+    reports = {name: entry for name, entry in previous.items() if name in hashes}
+    for name, files in results:
+        reports[name] = {"hash": hashes[name], "files": files, "exported": exported}
+    save_manifest(out_dir, {"version": REPORT_VERSION, "reports": reports})
+    return [name for name, _ in results], len(hashes) - len(results)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export static HTML reports of every study page and the comparison dashboard")
+    parser.add_argument("--metrics", default="metrics_data.csv")
+    parser.add_argument("--confusion", default="confusion_data.csv")
+    parser.add_argument("--output", default="reports", help="report directory; holds the manifest of the previous export")
+    parser.add_argument("--workers", type=int, default=None, help="processes rendering reports (default: one per CPU)")
+    parser.add_argument("--png", action="store_true", help="also write PNGs of the charts (requires kaleido)")
+    parser.add_argument("--force", action="store_true", help="re-export reports whose inputs have not changed")
+    args = parser.parse_args()
+
+    if importlib.util.find_spec("vl_convert") is None:
+        parser.error("bundling the Vega-Lite libraries into the reports requires the vl-convert-python package")
+    if args.png and importlib.util.find_spec("kaleido") is None:
+        parser.error("--png requires the kaleido package")
+
+    exported, skipped = export_reports(read_data_file(args.metrics), read_data_file(args.confusion), args.output, args.workers, args.png, args.force)
+    print(f"Exported {len(exported)} reports to {args.output}, skipped {skipped} unchanged")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+# Default size limit of the cached responses, in bytes
+RESPONSE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+# Cache hits whose last_used timestamp is buffered before being written in one transaction
+LAST_USED_FLUSH_SIZE = 256
+
+# Function to normalize record text so whitespace and case differences map to the same cache entry
+def normalize_record_text(title, abstract):
+    return " ".join(f"{title or ''}\n{abstract or ''}".lower().split())
+
+# Function to build the content-addressed key of a (model, prompt, record text) triple
+def response_key(model, prompt, record_text):
+    return hashlib.sha256(f"{model}\0{prompt}\0{record_text}".encode()).hexdigest()
+
+# Class to persist model replies in SQLite with least-recently-used eviction and hit-rate statistics
+class ResponseCache:
+    def __init__(self, path, max_bytes=RESPONSE_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._last_used = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+        self._conn.commit()
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    # Function to get a cached reply, or None on a miss
+    # A hit only buffers its last_used update; buffered updates are written every LAST_USED_FLUSH_SIZE hits, on put and on close.
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._last_used[key] = time.time()
+            if len(self._last_used) >= LAST_USED_FLUSH_SIZE:
+                self._flush_last_used()
+                self._conn.commit()
+            return row[0]
+
+    # Function to write the buffered last_used updates; the caller holds the lock and commits
+    def _flush_last_used(self):
+        if self._last_used:
+            self._conn.executemany("UPDATE responses SET last_used = ? WHERE key = ?", [(used, key) for key, used in self._last_used.items()])
+            self._last_used.clear()
+
+    # Function to store a reply, evicting the least recently used replies when over the size limit
+    def put(self, key, model, response):
+        size = len(response.encode())
+        now = time.time()
+        with self._lock:
+            self._flush_last_used()
+            previous = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)", (key, model, response, size, now, now))
+            self._bytes += size - (previous[0] if previous else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    # Function to delete the least recently used replies until the cache is back under 90% of its size limit
+    def _evict(self):
+        target = 0.9 * self.max_bytes
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall():
+            if self._bytes <= target:
+                break
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._bytes -= size
+
+    # Function to report the cache counters
+    def stats(self):
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            self._flush_last_used()
+            self._conn.commit()
+            self._conn.close()
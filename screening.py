@@ -0,0 +1,254 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import re
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from metrics_engine import LABELS
+from prioritization import apply_recall_cutoff, prioritize
+from response_cache import ResponseCache, normalize_record_text, response_key
+
+# Screening stages in pipeline order: decision column written to the log -> model the stage calls
+STAGE_MODELS = {"GPT-3.5": "gpt-3.5-turbo", "GPT-4o": "gpt-4o"}
+
+# Prompt sent for every record; the model must answer with one of LABELS
+DEFAULT_PROMPT = """You are screening records for a systematic review.
+
+Eligibility criteria:
+{criteria}
+
+Title: {title}
+Abstract: {abstract}
+
+Answer with exactly one of: Include, Exclude, Insufficient Information."""
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes that are retried instead of failing the record
+RETRY_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Exception raised when a model call fails in a way that may succeed on retry
+class RetryableError(Exception):
+    pass
+
+# Class to limit the request rate: `rate` tokens are added per second up to `capacity`, and each call takes one
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    # Function to wait until a token is available and take it
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+# Class to call an OpenAI-compatible chat completions endpoint; blocking HTTP runs in worker threads
+class ChatCompletionsClient:
+    def __init__(self, base_url, api_key=None, timeout=60):
+        self.url = base_url.rstrip("/") + "/chat/completions"
+        self.api_key = api_key if api_key is not None else os.environ.get("OPENAI_API_KEY")
+        self.timeout = timeout
+
+    # Function to send one prompt to a model and return the text of its reply
+    async def complete(self, model, prompt):
+        return await asyncio.to_thread(self._post, model, prompt)
+
+    def _post(self, model, prompt):
+        body = json.dumps({"model": model, "messages": [{"role": "user", "content": prompt}], "temperature": 0}).encode()
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        request = urllib.request.Request(self.url, data=body, headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                payload = json.load(response)
+        except urllib.error.HTTPError as e:
+            if e.code in RETRY_STATUS_CODES:
+                raise RetryableError(f"HTTP {e.code} from {self.url}") from e
+            raise
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            raise RetryableError(str(e)) from e
+        return payload["choices"][0]["message"]["content"]
+
+# Function to map a model reply to the first of LABELS it mentions, falling back to "Insufficient Information"
+def parse_decision(text):
+    match = re.search("|".join(re.escape(label) for label in LABELS), text, re.IGNORECASE)
+    if match is None:
+        return "Insufficient Information"
+    return next(label for label in LABELS if label.lower() == match.group(0).lower())
+
+# Function to read the (Study, record_id) keys already present in a checkpoint file; record ids are only unique within a study
+# An unterminated last line is a row interrupted mid-write (e.g. by a crash) and is ignored, so that record is screened again.
+def read_checkpoint(path):
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, "rb") as f:
+        data = f.read()
+    rows = (json.loads(line) for line in data[:data.rfind(b"\n") + 1].splitlines() if line.strip())
+    return {(row["Study"], row["record_id"]) for row in rows}
+
+# Function to cut an unterminated last line off a checkpoint, so rows appended on resume start on a line of their own
+def drop_partial_line(path):
+    if not path or not os.path.exists(path):
+        return
+    with open(path, "rb+") as f:
+        data = f.read()
+        f.truncate(data.rfind(b"\n") + 1)
+
+# Class to screen records through every stage with bounded concurrency, rate limiting, retries and a JSONL checkpoint
+# Each completed record is appended to the checkpoint as one decision-log row (Study, record_id, Human, one column per stage),
+# which is the input format of ingestion.ingest_decision_logs.
+class ScreeningRunner:
+    def __init__(self, client, criteria, stages=STAGE_MODELS, concurrency=16, rate=10.0, burst=None, max_retries=5, backoff=1.0, checkpoint_path=None, prompt_template=DEFAULT_PROMPT, cache=None):
+        self.client = client
+        self.criteria = criteria
+        self.stages = dict(stages)
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.checkpoint_path = checkpoint_path
+        self.prompt_template = prompt_template
+        self.cache = cache
+        self.calls = 0
+        self.retries = 0
+        self.failures = []
+
+    # Function to call a model, retrying retryable failures with exponential backoff and jitter
+    async def call_model(self, bucket, model, prompt):
+        for attempt in range(self.max_retries + 1):
+            await bucket.acquire()
+            self.calls += 1
+            try:
+                return await self.client.complete(model, prompt)
+            except RetryableError:
+                if attempt == self.max_retries:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self.backoff * 2 ** attempt * (0.5 + random.random()))
+
+    # Function to build the prompt of one record
+    def prompt(self, record):
+        return self.prompt_template.format(criteria=self.criteria, title=record.get("Title", ""), abstract=record.get("Abstract", ""))
+
+    # Function to get a model's reply to a record, from the response cache when the (model, prompt, record text) triple was seen before
+    # The cache key covers the prompt template with the criteria filled in, so changing the criteria re-screens every record
+    # Cache lookups and writes are blocking SQLite calls, so they run in worker threads instead of stalling the event loop
+    async def reply(self, bucket, model, record):
+        prompt = self.prompt(record)
+        if self.cache is None:
+            return await self.call_model(bucket, model, prompt)
+        key = response_key(model, self.prompt_template.format(criteria=self.criteria, title="", abstract=""), normalize_record_text(record.get("Title"), record.get("Abstract")))
+        response = await asyncio.to_thread(self.cache.get, key)
+        if response is None:
+            response = await self.call_model(bucket, model, prompt)
+            await asyncio.to_thread(self.cache.put, key, model, response)
+        return response
+
+    # Function to run one record through every stage and return its decision-log row
+    async def screen_record(self, bucket, record):
+        human = record.get("Human")
+        row = {"Study": record["Study"], "record_id": record["record_id"], "Human": None if pd.isna(human) else human}
+        for column, model in self.stages.items():
+            row[column] = parse_decision(await self.reply(bucket, model, record))
+        return row
+
+    # Function to screen records, skipping the (Study, record_id) pairs already in the checkpoint, and return the new decision rows
+    # A record that fails (retries exhausted, a non-retryable HTTP error or a malformed reply) is logged, kept in `failures`
+    # and left out of the checkpoint so the next run retries it; the other records carry on.
+    # Blocking HTTP and cache calls run on the loop's default executor, sized here to `concurrency` so every worker gets a thread.
+    async def run(self, records):
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency))
+        done = read_checkpoint(self.checkpoint_path)
+        drop_partial_line(self.checkpoint_path)
+        queue = asyncio.Queue()
+        for record in records:
+            if (record["Study"], record["record_id"]) not in done:
+                queue.put_nowait(record)
+
+        bucket = TokenBucket(self.rate, self.burst)
+        rows = []
+        checkpoint = open(self.checkpoint_path, "a") if self.checkpoint_path else None
+
+        async def worker():
+            while True:
+                try:
+                    record = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    row = await self.screen_record(bucket, record)
+                except Exception as e:
+                    logger.warning("Screening record %s of study %s failed: %r", record["record_id"], record["Study"], e)
+                    self.failures.append((record["record_id"], repr(e)))
+                    continue
+                rows.append(row)
+                if checkpoint is not None:
+                    checkpoint.write(json.dumps(row) + "\n")
+                    checkpoint.flush()
+
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+        return rows
+
+# Function to screen records from a DataFrame (Study, record_id, Title, Abstract and optionally Human) and return the decision log
+def run_screening(records, client, criteria, **kwargs):
+    runner = ScreeningRunner(client, criteria, **kwargs)
+    rows = asyncio.run(runner.run(records.to_dict("records")))
+    if runner.failures:
+        logger.warning("%d records failed and were left out of the checkpoint; rerun to retry them", len(runner.failures))
+    return pd.DataFrame(rows, columns=["Study", "record_id", "Human", *runner.stages])
+
+def main():
+    parser = argparse.ArgumentParser(description="Screen title/abstract records with the First Review and Evaluation Step models")
+    parser.add_argument("records", help="CSV with Study, record_id, Title, Abstract and optionally Human columns")
+    parser.add_argument("--criteria", required=True, help="text file with the eligibility criteria")
+    parser.add_argument("--base-url", default="https://api.openai.com/v1")
+    parser.add_argument("--output", default="decisions.jsonl", help="decision log, also used as the resume checkpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rate", type=float, default=10.0, help="maximum model calls per second")
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--cache", default=None, help="SQLite file caching model replies across runs")
+    parser.add_argument("--cache-max-mb", type=float, default=256)
+    parser.add_argument("--prioritize", action="store_true", help="screen records in BM25 order against the criteria")
+    parser.add_argument("--target-recall", type=float, default=None, help="with --prioritize, screen only the recall-safe prefix calibrated on labelled records")
+    args = parser.parse_args()
+
+    with open(args.criteria) as f:
+        criteria = f.read()
+    records = pd.read_csv(args.records, dtype={"record_id": str})
+    if args.prioritize:
+        records = prioritize(records, criteria)
+        if args.target_recall is not None:
+            records = apply_recall_cutoff(records, args.target_recall)
+    client = ChatCompletionsClient(args.base_url)
+    cache = ResponseCache(args.cache, max_bytes=int(args.cache_max_mb * 1024 * 1024)) if args.cache else None
+    start = time.perf_counter()
+    decisions = run_screening(records, client, criteria, concurrency=args.concurrency, rate=args.rate, max_retries=args.max_retries, checkpoint_path=args.output, cache=cache)
+    print(f"Screened {len(decisions)} records in {time.perf_counter() - start:.1f}s; decisions appended to {args.output}")
+    if cache is not None:
+        print(f"Response cache: {cache.stats()}")
+        cache.close()
+
+if __name__ == "__main__":
+    main()
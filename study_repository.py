@@ -0,0 +1,72 @@
+import pandas as pd
+from compact_frames import widen_floats
+from agreement import agreement_frame, transitions_from_frame
+
+# Class to index metrics and confusion data by study once at load time so pages can look up their slices directly
+class StudyRepository:
+    def __init__(self, metrics_data, confusion_data, recall_curves=None, transition_data=None, threshold_curves=None):
+        self.metrics_data = metrics_data
+        self.confusion_data = confusion_data
+        self.recall_curves = recall_curves
+        self.transition_data = transition_data
+        self.threshold_curves = threshold_curves
+        self.studies = metrics_data["Study"].unique().tolist()
+
+        self._metrics = dict(tuple(metrics_data.groupby("Study", sort=False, observed=True)))
+        self._confusion = dict(tuple(confusion_data.groupby("Study", sort=False, observed=True)))
+        self._confusion_by_category = dict(tuple(confusion_data.groupby(["Study", "Category"], sort=False, observed=True)))
+
+        # Keep the first row per (Study, Metric), matching the previous `.values[0]` lookups
+        self._metric_rows = {}
+        for row in widen_floats(metrics_data).to_dict("records"):
+            self._metric_rows.setdefault(row["Study"], {}).setdefault(row["Metric"], row)
+
+        self._recall_curves = {} if recall_curves is None else dict(tuple(recall_curves.groupby("Study", sort=False, observed=True)))
+        self._threshold_curves = {} if threshold_curves is None else dict(tuple(threshold_curves.groupby("Study", sort=False, observed=True)))
+
+        # Agreement of every study is computed in one vectorized pass over the stacked 3x3 transition matrices
+        self._transitions, self._agreement = {}, {}
+        if transition_data is not None:
+            names, transitions = transitions_from_frame(transition_data)
+            self._transitions = dict(zip(names, transitions))
+            self._agreement = {row["Study"]: row for row in agreement_frame(names, transitions).to_dict("records")}
+
+    # Function to get the metrics rows of one study
+    def metrics(self, study):
+        return self._metrics.get(study, self.metrics_data.iloc[0:0])
+
+    # Function to get the metric names of one study, in file order
+    def metric_names(self, study):
+        return list(self._metric_rows.get(study, {}))
+
+    # Function to get the metric rows of one study keyed by metric name
+    def metric_rows(self, study):
+        return self._metric_rows.get(study, {})
+
+    # Function to get the confusion rows of one study, optionally for a single category
+    def confusion(self, study, category=None):
+        if category is None:
+            return self._confusion.get(study, self.confusion_data.iloc[0:0])
+        return self._confusion_by_category.get((study, category), self.confusion_data.iloc[0:0])
+
+    # Function to get the combined metrics of the given studies (all studies by default)
+    def combined_metrics(self, studies=None):
+        if studies is None:
+            return self.metrics_data
+        return pd.concat([self.metrics(study) for study in studies])
+
+    # Function to get the prioritization recall curve of one study, or None when none was computed
+    def recall_curve(self, study):
+        return self._recall_curves.get(study)
+
+    # Function to get the threshold sweep curves of one study (one row per model and threshold), or None when none were computed
+    def threshold_curve(self, study):
+        return self._threshold_curves.get(study)
+
+    # Function to get the First Review x Evaluation Step transition counts of one study (3x3, indexed by LABELS), or None
+    def transitions(self, study):
+        return self._transitions.get(study)
+
+    # Function to get the agreement row (kappas and agreement rates) of one study, or None when no transitions were loaded
+    def agreement(self, study):
+        return self._agreement.get(study)
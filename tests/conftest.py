@@ -0,0 +1,5 @@
+# Put the repository root on sys.path, so the top-level modules import when pytest is run as a plain `pytest`
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,45 @@
+# Cohen's and weighted kappa on a known transition table
+import numpy as np
+import pandas as pd
+import pytest
+from agreement import agreement_frame, cohen_kappa, transition_counts, transitions_from_frame, weighted_kappa
+from ingestion import STAGE_COLUMNS
+
+# First Review (rows) x Evaluation Step (columns) counts over Include, Insufficient Information, Exclude
+TABLE = np.array([[20, 5, 0], [3, 10, 2], [1, 4, 15]])
+
+def test_kappa_of_known_table():
+    # po = 45/60, pe = (25*24 + 15*19 + 20*17) / 60**2
+    assert cohen_kappa(TABLE) == pytest.approx(59 / 95)
+    assert weighted_kappa(TABLE, "linear") == pytest.approx(29 / 41)
+    assert weighted_kappa(TABLE, "quadratic") == pytest.approx(401 / 509)
+
+def test_kappa_is_computed_per_study():
+    kappas = cohen_kappa(np.stack([TABLE, np.diag([5, 5, 5])]))
+    assert kappas == pytest.approx([59 / 95, 1.0])
+
+def test_kappa_without_chance_disagreement_is_undefined():
+    table = np.zeros((3, 3), dtype=np.int64)
+    table[0, 0] = 10
+    assert np.isnan(cohen_kappa(table))
+    assert np.isnan(weighted_kappa(table, "quadratic"))
+    agreement = agreement_frame(["S1"], table[None])
+    assert agreement.loc[0, "Observed Agreement"] == 1.0
+    assert agreement["Cohen's Kappa"].isna().all()
+
+def test_transition_counts_round_trip_ignores_unknown_labels():
+    first, second = STAGE_COLUMNS
+    decisions = pd.DataFrame({
+        "Study": ["S1", "S1", "S1", None],
+        first: ["Include", "Exclude", "Maybe", "Include"],
+        second: ["Include", "Insufficient Information", "Exclude", "Include"],
+    })
+    studies, transitions = transition_counts(decisions)
+    assert studies == ["S1"]
+    assert transitions[0].tolist() == [[1, 0, 0], [0, 0, 0], [0, 1, 0]]
+
+    first_label, second_label = list(STAGE_COLUMNS.values())[:2]
+    frame = pd.DataFrame({"Study": ["S1", "S1", None], first_label: ["Include", "Maybe", "Include"], second_label: ["Include", "Exclude", "Exclude"], "Count": [3, 5, 7]})
+    studies, transitions = transitions_from_frame(frame)
+    assert studies == ["S1"]
+    assert transitions[0].tolist() == [[3, 0, 0], [0, 0, 0], [0, 0, 0]]
@@ -0,0 +1,47 @@
+# Bootstrap intervals: output shapes, reproducibility and coverage on simulated studies
+import numpy as np
+import pandas as pd
+from confidence_intervals import bootstrap_intervals, interval_frame, joint_counts
+from metrics_engine import METRICS, decision_counts
+
+# Cell probabilities of (Human Include, Human Exclude) x LABELS for both models in the coverage simulation
+CELL_PROBABILITIES = np.array([[0.15, 0.03, 0.02], [0.10, 0.05, 0.65]])
+
+def random_decisions(rng, studies=3, records=150):
+    labels = ["Include", "Insufficient Information", "Exclude"]
+    return pd.DataFrame({
+        "Study": np.repeat([f"S{i}" for i in range(studies)], records),
+        "Human": rng.choice(["Include", "Exclude"], studies * records, p=[0.2, 0.8]),
+        "GPT-3.5": rng.choice(labels, studies * records),
+        "GPT-4o": rng.choice(labels, studies * records),
+    })
+
+def test_interval_shapes_and_bounds():
+    decisions = random_decisions(np.random.default_rng(0))
+    studies, counts = decision_counts(decisions)
+    intervals = bootstrap_intervals(counts, resamples=500, seed=1)
+
+    assert intervals["lower"].shape == intervals["upper"].shape == (3, len(METRICS), 2)
+    assert intervals["difference_lower"].shape == intervals["difference_upper"].shape == (3, len(METRICS))
+    assert (intervals["lower"] <= intervals["upper"]).all()
+    assert (intervals["difference_lower"] <= intervals["difference_upper"]).all()
+    assert len(interval_frame(studies, intervals)) == 3 * len(METRICS)
+
+def test_paired_intervals_are_reproducible():
+    _, counts = joint_counts(random_decisions(np.random.default_rng(0)))
+    first = bootstrap_intervals(counts, resamples=500, seed=1, paired=True)
+    second = bootstrap_intervals(counts, resamples=500, seed=1, paired=True)
+
+    assert first["lower"].shape == (3, len(METRICS), 2)
+    assert all(np.array_equal(first[key], second[key]) for key in first)
+
+def test_accuracy_interval_coverage():
+    # 200 simulated studies of 200 records each; the 95% percentile interval should cover the true accuracy about 95% of the time
+    rng = np.random.default_rng(7)
+    counts = rng.multinomial(200, CELL_PROBABILITIES.ravel(), size=(200, 2)).reshape(200, 2, 2, 3)
+    intervals = bootstrap_intervals(counts, resamples=1000, seed=3)
+    accuracy = METRICS.index("Accuracy")
+    truth = CELL_PROBABILITIES[0, :2].sum() + CELL_PROBABILITIES[1, 2]
+
+    covered = (intervals["lower"][:, accuracy, 0] <= truth) & (truth <= intervals["upper"][:, accuracy, 0])
+    assert 0.9 <= covered.mean() <= 0.99
@@ -0,0 +1,40 @@
+# Dashboard metrics computed from per-record decisions, checked against hand-computed values
+import numpy as np
+import pandas as pd
+import pytest
+from metrics_engine import METRICS, compute_metrics, decision_counts, metrics_from_decisions
+
+@pytest.fixture
+def decisions():
+    # GPT-4o: tp=1, fn=1, fp=1 (Insufficient Information counts as positive), tn=2; the "Maybe" row is ignored for GPT-4o only
+    # GPT-3.5: Include everywhere, so tp=2, fp=4; the unlabelled record is ignored for both models
+    return pd.DataFrame({
+        "Study": ["S1"] * 7,
+        "Human": ["Include", "Include", "Exclude", "Exclude", "Exclude", None, "Exclude"],
+        "GPT-3.5": ["Include"] * 7,
+        "GPT-4o": ["Include", "Exclude", "Insufficient Information", "Exclude", "Exclude", "Include", "Maybe"],
+    })
+
+def test_decision_counts(decisions):
+    studies, counts = decision_counts(decisions)
+    assert studies == ["S1"]
+    assert counts[0, 0].tolist() == [[2, 0, 0], [4, 0, 0]]
+    assert counts[0, 1].tolist() == [[1, 0, 1], [0, 1, 2]]
+
+def test_weighted_metrics(decisions):
+    metrics = metrics_from_decisions(decisions).set_index("Metric")
+    # Include class weight 2/5 and Exclude class weight 3/5 for GPT-4o; 2/6 and 4/6 for GPT-3.5
+    expected_gpt4 = {"Recall": 0.6, "Precision": 0.6, "F1 Score": 0.6, "Specificity": 0.4 * 2 / 3 + 0.6 * 0.5, "Accuracy": 0.6}
+    expected_gpt3_5 = {"Recall": 1 / 3, "Precision": 1 / 9, "F1 Score": 1 / 6, "Specificity": 2 / 3, "Accuracy": 1 / 3}
+    assert list(metrics.index) == METRICS
+    assert metrics["GPT-4 Average"].to_dict() == pytest.approx(expected_gpt4, abs=1e-4)
+    assert metrics["GPT-3.5 Average"].to_dict() == pytest.approx(expected_gpt3_5, abs=1e-4)
+    assert metrics.loc["Recall", "Improvement"] == "+80.00%"
+
+def test_binary_metrics_score_the_include_class():
+    metrics = compute_metrics(np.array(1), np.array(1), np.array(1), np.array(2), average="binary")
+    assert {name: float(value) for name, value in metrics.items()} == pytest.approx({"Recall": 0.5, "Precision": 0.5, "F1 Score": 0.5, "Specificity": 2 / 3, "Accuracy": 0.6})
+
+def test_empty_study_scores_zero():
+    metrics = compute_metrics(*(np.zeros(1),) * 4)
+    assert all(value.tolist() == [0.0] for value in metrics.values())
@@ -0,0 +1,99 @@
+# Screening runner against the local mock chat completions server
+import asyncio
+import json
+import random
+import pandas as pd
+import pytest
+from mock_llm_server import start_mock_server
+from screening import ChatCompletionsClient, ScreeningRunner, read_checkpoint, run_screening
+
+CRITERIA = "Adults undergoing free fibula flap reconstruction."
+
+@pytest.fixture
+def records():
+    return pd.DataFrame({
+        "Study": ["S1"] * 12,
+        "record_id": [str(i) for i in range(12)],
+        "Title": [f"Record {i}" for i in range(12)],
+        "Abstract": [f"Abstract of record {i}" for i in range(12)],
+        "Human": ["Include", "Exclude", None] * 4,
+    })
+
+@pytest.fixture
+def mock_server():
+    servers = []
+
+    def start(**kwargs):
+        server, url = start_mock_server(**kwargs)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+def test_retries_rate_limited_calls(records, mock_server):
+    random.seed(0)
+    server, url = mock_server(failure_rate=0.3)
+    runner = ScreeningRunner(ChatCompletionsClient(url), CRITERIA, concurrency=4, rate=1000, max_retries=20, backoff=0.001)
+    rows = asyncio.run(runner.run(records.to_dict("records")))
+
+    assert len(rows) == len(records)
+    assert runner.failures == []
+    assert runner.retries > 0
+    assert server.requests == len(records) * len(runner.stages)
+    assert runner.calls == server.requests + runner.retries
+
+def test_resumes_from_checkpoint(records, mock_server, tmp_path):
+    server, url = mock_server()
+    checkpoint = tmp_path / "decisions.jsonl"
+    first = run_screening(records.iloc[:5], ChatCompletionsClient(url), CRITERIA, rate=1000, checkpoint_path=str(checkpoint))
+    second = run_screening(records, ChatCompletionsClient(url), CRITERIA, rate=1000, checkpoint_path=str(checkpoint))
+
+    assert len(first) == 5
+    assert sorted(second["record_id"]) == sorted(records["record_id"].iloc[5:])
+    assert read_checkpoint(str(checkpoint)) == set(zip(records["Study"], records["record_id"]))
+    assert server.requests == len(records) * 2
+    logged = [json.loads(line) for line in checkpoint.read_text().splitlines()]
+    assert [row["Human"] for row in logged if row["record_id"] == "2"] == [None]
+
+def test_failed_record_does_not_stop_the_run(records, mock_server, tmp_path):
+    server, url = mock_server()
+
+    # Client that fails every call for record 3 with a non-retryable error
+    class FailingClient(ChatCompletionsClient):
+        async def complete(self, model, prompt):
+            if "Record 3\n" in prompt:
+                raise ValueError("malformed reply")
+            return await super().complete(model, prompt)
+
+    checkpoint = tmp_path / "decisions.jsonl"
+    runner = ScreeningRunner(FailingClient(url), CRITERIA, rate=1000, checkpoint_path=str(checkpoint))
+    rows = asyncio.run(runner.run(records.to_dict("records")))
+
+    assert len(rows) == len(records) - 1
+    assert [record_id for record_id, _ in runner.failures] == ["3"]
+    assert ("S1", "3") not in read_checkpoint(str(checkpoint))
+
+def test_resume_keys_records_by_study(records, mock_server, tmp_path):
+    server, url = mock_server()
+    checkpoint = tmp_path / "decisions.jsonl"
+    other = records.assign(Study="S2")
+    run_screening(records.iloc[:2], ChatCompletionsClient(url), CRITERIA, rate=1000, checkpoint_path=str(checkpoint))
+    second = run_screening(pd.concat([records.iloc[:2], other.iloc[:2]]), ChatCompletionsClient(url), CRITERIA, rate=1000, checkpoint_path=str(checkpoint))
+
+    assert list(second["Study"]) == ["S2", "S2"]
+    assert read_checkpoint(str(checkpoint)) == {("S1", "0"), ("S1", "1"), ("S2", "0"), ("S2", "1")}
+
+def test_resume_after_partly_written_row(records, mock_server, tmp_path):
+    server, url = mock_server()
+    checkpoint = tmp_path / "decisions.jsonl"
+    run_screening(records.iloc[:3], ChatCompletionsClient(url), CRITERIA, rate=1000, checkpoint_path=str(checkpoint))
+    lines = checkpoint.read_text().splitlines(keepends=True)
+    checkpoint.write_text("".join(lines[:2]) + lines[2][:20])
+
+    assert len(read_checkpoint(str(checkpoint))) == 2
+    resumed = run_screening(records.iloc[:3], ChatCompletionsClient(url), CRITERIA, rate=1000, checkpoint_path=str(checkpoint))
+    assert len(resumed) == 1
+    assert len([json.loads(line) for line in checkpoint.read_text().splitlines()]) == 3
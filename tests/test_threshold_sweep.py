@@ -0,0 +1,52 @@
+# Vectorized threshold sweep checked against a brute-force loop over thresholds
+import numpy as np
+import pandas as pd
+import pytest
+from metrics_engine import METRICS, compute_metrics
+from threshold_sweep import downsample_curves, threshold_sweep
+
+@pytest.fixture
+def decisions():
+    # Scores are rounded so thresholds have ties; unlabelled and unscored records are left out of the sweep
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({
+        "Study": rng.choice(["S1", "S2", "S3"], 300),
+        "Human": rng.choice(["Include", "Exclude"], 300, p=[0.3, 0.7]),
+        "Score": rng.random(300).round(2),
+    })
+    frame.loc[::25, "Human"] = None
+    frame.loc[::40, "Score"] = np.nan
+    return frame
+
+# Function to compute the sweep one threshold and one study at a time
+def brute_force_sweep(decisions):
+    labelled = decisions[decisions["Human"].notna() & decisions["Score"].notna()]
+    rows = []
+    for study, records in labelled.groupby("Study", sort=False):
+        included = records["Human"].to_numpy() == "Include"
+        for threshold in sorted(records["Score"].unique(), reverse=True):
+            predicted = records["Score"].to_numpy() >= threshold
+            counts = [np.sum(predicted & included), np.sum(predicted & ~included), np.sum(~predicted & included), np.sum(~predicted & ~included)]
+            metrics = compute_metrics(*(np.array(count) for count in counts))
+            rows.append({"Study": study, "Threshold": threshold, "TP": counts[0], "FP": counts[1], "FN": counts[2], "TN": counts[3], **{name: float(metrics[name]) for name in METRICS}})
+    return pd.DataFrame(rows)
+
+def test_sweep_matches_brute_force(decisions):
+    swept = threshold_sweep(decisions, "Score").sort_values(["Study", "Threshold"], ascending=[True, False]).reset_index(drop=True)
+    expected = brute_force_sweep(decisions).sort_values(["Study", "Threshold"], ascending=[True, False]).reset_index(drop=True)
+
+    assert len(swept) == len(expected)
+    assert swept["Study"].tolist() == expected["Study"].tolist()
+    assert (swept[["TP", "FP", "FN", "TN"]].to_numpy(dtype=int) == expected[["TP", "FP", "FN", "TN"]].to_numpy(dtype=int)).all()
+    for column in ["Threshold", *METRICS]:
+        assert swept[column].to_numpy() == pytest.approx(expected[column].to_numpy())
+
+def test_downsampling_keeps_curve_ends(decisions):
+    curves = threshold_sweep(decisions, "Score").assign(Model="GPT-4o")
+    sampled = downsample_curves(curves, points=10)
+
+    assert sampled.groupby("Study").size().max() <= 11
+    for study, curve in curves.groupby("Study"):
+        kept = sampled[sampled["Study"] == study]
+        assert kept["Threshold"].iloc[0] == curve["Threshold"].iloc[0]
+        assert kept["Threshold"].iloc[-1] == curve["Threshold"].iloc[-1]
@@ -0,0 +1,118 @@
+import argparse
+import numpy as np
+import pandas as pd
+from metrics_engine import METRICS, MODEL_COLUMNS, POSITIVE_LABELS, compute_metrics, safe_ratio
+
+# Score column of each model: the model's probability that a record should be included
+SCORE_COLUMNS = {model: f"{model} Score" for model in MODEL_COLUMNS}
+
+# Maximum number of points kept per (study, model) curve when curves are written for the dashboard
+CURVE_POINTS = 200
+
+# Columns the precision-recall and ROC charts encode, computed for the Include class only
+CURVE_COLUMNS = ["Include Recall", "Include Precision", "False Positive Rate"]
+
+# Function to turn a reported label and its confidence (as written by cascade.py) into an Include score
+def include_scores(labels, confidence, positive_labels=POSITIVE_LABELS):
+    confidence = pd.to_numeric(confidence, errors="coerce").to_numpy(dtype=float)
+    return np.where(pd.Series(labels).isin(positive_labels).to_numpy(), confidence, 1 - confidence)
+
+# Function to compute every dashboard metric at every distinct threshold of one model, for all studies in one pass
+# A record is predicted Include when its score is >= the threshold. Records are sorted once by (study, descending score);
+# cumulative sums of the Include labels then give tp and fp at each cut, and the last row of each run of tied scores
+# is the operating point of that threshold. Runs in O(records log records) instead of O(thresholds x records).
+def threshold_sweep(decisions, score_column, study_column="Study", truth_column="Human", average="weighted"):
+    scores = pd.to_numeric(decisions[score_column], errors="coerce").to_numpy(dtype=float)
+    study_codes, studies = pd.factorize(decisions[study_column], sort=False)
+    labelled = decisions[truth_column].notna().to_numpy()
+    valid = (study_codes >= 0) & labelled & ~np.isnan(scores)
+    scores, study_codes = scores[valid], study_codes[valid]
+    included = (decisions[truth_column].to_numpy()[valid] == "Include").astype(np.int64)
+
+    order = np.lexsort((-scores, study_codes))
+    scores, study_codes, included = scores[order], study_codes[order], included[order]
+    positives = np.bincount(study_codes, weights=included, minlength=len(studies)).astype(np.int64)
+    totals = np.bincount(study_codes, minlength=len(studies))
+    starts = np.r_[0, np.cumsum(totals)[:-1]]
+
+    # Cumulative counts restart at each study: subtract the running totals reached before the study's first row
+    found = np.cumsum(included)
+    tp = found - np.r_[0, found][starts][study_codes]
+    predicted = np.arange(1, len(scores) + 1) - starts[study_codes]
+    last = np.r_[(study_codes[1:] != study_codes[:-1]) | (scores[1:] != scores[:-1]), True] if len(scores) else np.zeros(0, dtype=bool)
+
+    tp, predicted, study_codes = tp[last], predicted[last], study_codes[last]
+    fp = predicted - tp
+    fn = positives[study_codes] - tp
+    tn = totals[study_codes] - positives[study_codes] - fp
+    metrics = compute_metrics(tp, fp, fn, tn, average=average)
+    return pd.DataFrame({
+        "Study": np.asarray(studies, dtype=object)[study_codes],
+        "Threshold": scores[last],
+        "TP": tp, "FP": fp, "FN": fn, "TN": tn,
+        **{name: metrics[name] for name in METRICS},
+        "Include Recall": safe_ratio(tp, tp + fn),
+        "Include Precision": safe_ratio(tp, tp + fp),
+        "False Positive Rate": safe_ratio(fp, fp + tn),
+    })
+
+# Function to sweep every model's scores and stack the curves with a Model column
+def threshold_curves(decisions, score_columns=SCORE_COLUMNS, study_column="Study", truth_column="Human", average="weighted"):
+    curves = [threshold_sweep(decisions, column, study_column, truth_column, average).assign(Model=model) for model, column in score_columns.items() if column in decisions]
+    curves = pd.concat(curves, ignore_index=True) if curves else threshold_sweep(decisions.assign(Score=np.nan), "Score", study_column, truth_column, average).assign(Model=None)
+    return curves[["Study", "Model", *curves.columns.drop(["Study", "Model"])]]
+
+# Function to keep at most about `points` rows of each (Study, Model) curve, evenly spaced along the threshold order
+# The first and last points of each curve are always kept, so the curves still span the full recall range.
+def downsample_curves(curves, points=CURVE_POINTS):
+    group = curves.groupby(["Study", "Model"], sort=False).ngroup().to_numpy()
+    size = np.bincount(group)[group]
+    position = curves.groupby(["Study", "Model"], sort=False).cumcount().to_numpy()
+    bucket = position * (points - 1) // np.maximum(size - 1, 1)
+    keep = (size <= points) | (position == size - 1) | np.r_[True, (bucket[1:] != bucket[:-1]) | (group[1:] != group[:-1])]
+    return curves[keep].reset_index(drop=True)
+
+# Function to pick, per study and model, the highest threshold whose Include recall reaches the target
+def recall_thresholds(curves, target_recall=0.95):
+    reached = curves[curves["Include Recall"] >= target_recall]
+    best = reached.loc[reached.groupby(["Study", "Model"], sort=False)["Threshold"].idxmax()]
+    return best[["Study", "Model", "Threshold", "Include Recall", "Include Precision", *METRICS]].reset_index(drop=True)
+
+# Function to add the Score column of models that only logged a label and its confidence (cascade.py output)
+def with_include_scores(decisions, score_columns=SCORE_COLUMNS, confidence_column="Confidence"):
+    for model, column in score_columns.items():
+        if column not in decisions and model in decisions and confidence_column in decisions:
+            decisions[column] = include_scores(decisions[model], decisions[confidence_column])
+    return decisions
+
+# Function to read the decision logs, keeping only the columns the sweep uses among those each log has
+def read_scored_decisions(paths, score_columns=SCORE_COLUMNS, confidence_column="Confidence"):
+    columns = {"Study", "Human", confidence_column, *score_columns, *score_columns.values()}
+    frames = []
+    for path in paths:
+        if str(path).endswith((".jsonl", ".ndjson", ".json")):
+            frame = pd.read_json(path, lines=True, dtype=False)
+            frames.append(frame[[column for column in frame.columns if column in columns]])
+        else:
+            frames.append(pd.read_csv(path, usecols=lambda column: column in columns))
+    return with_include_scores(pd.concat(frames, ignore_index=True), score_columns, confidence_column)
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep the include threshold over model confidence scores and write precision-recall / ROC curves per study")
+    parser.add_argument("logs", nargs="+", help="CSV or JSONL decision logs with Study, Human and '<model> Score' columns (or a model label and Confidence)")
+    parser.add_argument("--output", default="threshold_curves.csv", help="downsampled curves read by the dashboard")
+    parser.add_argument("--points", type=int, default=CURVE_POINTS, help="maximum points kept per study and model")
+    parser.add_argument("--average", choices=["weighted", "binary"], default="weighted", help="averaging of the dashboard metrics at each threshold")
+    parser.add_argument("--target-recall", type=float, default=None, help="also report the highest threshold reaching this Include recall")
+    parser.add_argument("--thresholds-out", default="recall_thresholds.csv")
+    args = parser.parse_args()
+
+    curves = threshold_curves(read_scored_decisions(args.logs), average=args.average)
+    downsample_curves(curves, args.points).round(4).to_csv(args.output, index=False)
+    print(f"Wrote threshold curves for {curves['Study'].nunique()} studies to {args.output}")
+    if args.target_recall is not None:
+        recall_thresholds(curves, args.target_recall).round(4).to_csv(args.thresholds_out, index=False)
+        print(f"Wrote thresholds reaching {args.target_recall:.0%} recall to {args.thresholds_out}")
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,42 @@
+import hashlib
+import os
+import time
 import streamlit as st
 import pandas as pd
-import altair as alt
-import plotly.graph_objects as go
-from local_components import card_container
-from streamlit_extras.colored_header import colored_header
+from metrics_engine import LABELS
+from study_repository import StudyRepository
+from compact_frames import compact_frame
+from figure_cache import FIGURE_CACHE, figure_key
+from columnar_store import COLUMNAR_SUFFIXES, is_columnar
+from perf_instrumentation import finish_rerun, span, timed
+from confidence_intervals import CONFIDENCE_LEVEL
+from live_metrics import LIVE_REFRESH_SECONDS, LiveCounters
+from payload_shaping import comparison_chart_spec, comparison_payload, metric_long_frame
+from threshold_sweep import CURVE_COLUMNS
+
+# Charting backends and component packages are imported inside the functions that use them, so a page only pays
+# for the libraries it draws with; benchmarks/bench_imports.py checks that importing utils stays free of them.
+
+# Function to emit a Plotly chart (timed separately from figure construction when profiling)
+@timed("st.plotly_chart")
+def plotly_chart(fig):
+    st.plotly_chart(fig, use_container_width=True)
+
+# Function to emit a Vega-Lite chart (timed separately when profiling)
+@timed("st.vega_lite_chart")
+def vega_lite_chart(data, spec):
+    st.vega_lite_chart(data, spec, use_container_width=True)
+
+# Function to emit an Altair chart (timed separately when profiling)
+@timed("st.altair_chart")
+def altair_chart(chart):
+    st.altair_chart(chart, use_container_width=True)
 
 # Function to create a grouped bar chart
 def create_grouped_bar_chart(df):
-    df_melted = df.melt(id_vars=['Metric', 'Model'], value_vars=['Value'], var_name='Variable', value_name='MetricValue')
+    import altair as alt
+    with span("create_grouped_bar_chart.melt"):
+        df_melted = df.melt(id_vars=['Metric', 'Model'], value_vars=['Value'], var_name='Variable', value_name='MetricValue')
     chart = alt.Chart(df_melted).mark_bar().encode(
         x=alt.X('MetricValue:Q', title='Value'),
         y=alt.Y('Model:N', sort=None),
@@ -15,10 +44,36 @@ def create_grouped_bar_chart(df):
         row=alt.Row('Metric:N', title=None)
     ).configure_axisY(title=None).configure_facet(spacing=0).configure_header(labelAngle=0).properties(width='container', height=200)
     
-    st.altair_chart(chart, use_container_width=True)
+    altair_chart(chart)
+
+# Function to get the GPT-4o bootstrap interval of a metric row, or None when the metrics data has no interval columns
+def gpt4_interval(row):
+    lower, upper = row.get("GPT-4 Lower"), row.get("GPT-4 Upper")
+    if lower is None or upper is None or pd.isna(lower) or pd.isna(upper):
+        return None
+    return float(lower), float(upper)
 
-# Function to create a Plotly bullet chart
-def create_bullet_chart(metric, values, title):
+# Function to format the bootstrap intervals of a metric row for its card, or None when the metrics data has no interval columns
+def format_intervals(row):
+    if gpt4_interval(row) is None:
+        return None
+    return (f"{CONFIDENCE_LEVEL:.0%} CI: GPT-3.5 {100 * row['GPT-3.5 Lower']:.2f}–{100 * row['GPT-3.5 Upper']:.2f}, "
+            f"GPT-4o {100 * row['GPT-4 Lower']:.2f}–{100 * row['GPT-4 Upper']:.2f}, "
+            f"difference {100 * row['Difference Lower']:+.2f} to {100 * row['Difference Upper']:+.2f} points")
+
+# Function to get the gauge steps shading a GPT-4o interval (in percent) behind the bullet bar
+def interval_steps(interval):
+    return [] if interval is None else [{'range': [100 * interval[0], 100 * interval[1]], 'color': "lightsteelblue"}]
+
+# Function to create a Plotly bullet chart, served from the shared figure cache
+def create_bullet_chart(metric, values, title, interval=None):
+    key = figure_key("bullet", (metric, [float(value) for value in values], interval), title)
+    return FIGURE_CACHE.get_or_create(key, lambda: build_bullet_chart(metric, values, title, interval))
+
+# Function to build a Plotly bullet chart; the optional GPT-4o interval is shaded behind the bar
+@timed()
+def build_bullet_chart(metric, values, title, interval=None):
+    import plotly.graph_objects as go
     gpt4 = 100 * values[1]
     gpt3_5 = 100 * values[0]
     fig = go.Figure(go.Indicator(
@@ -26,18 +81,55 @@ def create_bullet_chart(metric, values, title):
         domain={'x': [0, 1], 'y': [0, 1]},
         delta={'reference': gpt3_5, 'position': "bottom"},
         title={'text': f"<b>{metric}</b><br><span style='color: gray; font-size:0.8em'>GPT-4o</span>", 'font': {"size": 20}},
-        gauge={'shape': "bullet", 'axis': {'range': [0, 100]}, 'threshold': {'line': {'color': "red", 'width': 2}, 'thickness': 0.75, 'value': gpt3_5}, 'bgcolor': "white", 'borderwidth': 0, 'bar': {'color': "darkblue"}}
+        gauge={'shape': "bullet", 'axis': {'range': [0, 100]}, 'threshold': {'line': {'color': "red", 'width': 2}, 'thickness': 0.75, 'value': gpt3_5}, 'steps': interval_steps(interval), 'bgcolor': "white", 'borderwidth': 0, 'bar': {'color': "darkblue"}}
     ))
     
     fig.update_layout(height=120, margin={'t': 0, 'b': 0, 'l': 110, 'r': 50}, xaxis=dict(showticklabels=False, showgrid=False, zeroline=False), yaxis=dict(showticklabels=False, showgrid=False, zeroline=False))
     
     return fig
 
-# Function to create a Vega-Lite metric chart
+# Height in pixels of one indicator row (bullet plus description) in a batched bullet chart
+BULLET_ROW_HEIGHT = 150
+
+# Function to create one figure holding the bullet indicators of several metric rows (of one or more studies), served from the shared figure cache
+def create_batched_bullet_chart(metric_rows, title=None):
+    rows = [(row.get("Study", ""), row["Metric"], float(row["GPT-3.5 Average"]), float(row["GPT-4 Average"]), row["Description"], gpt4_interval(row), format_intervals(row)) for row in metric_rows]
+    return FIGURE_CACHE.get_or_create(figure_key("bullet-batch", rows, title), lambda: build_batched_bullet_chart(rows, title))
+
+# Function to build one subplot figure with a bullet indicator per (study, metric, GPT-3.5, GPT-4o, description, interval, interval text) row
+@timed()
+def build_batched_bullet_chart(rows, title=None):
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    multi_study = len({study for study, *_ in rows}) > 1
+    fig = make_subplots(rows=len(rows), cols=1, specs=[[{"type": "indicator"}]] * len(rows), vertical_spacing=0.35 / len(rows))
+    for i, (study, metric, gpt3_5, gpt4, description, interval, interval_text) in enumerate(rows):
+        subtitle = study if multi_study else "GPT-4o"
+        fig.add_trace(go.Indicator(
+            mode="number+gauge+delta", value=100 * gpt4,
+            delta={'reference': 100 * gpt3_5, 'position': "bottom"},
+            title={'text': f"<b>{metric}</b><br><span style='color: gray; font-size:0.8em'>{subtitle}</span>", 'font': {"size": 20}},
+            gauge={'shape': "bullet", 'axis': {'range': [0, 100]}, 'threshold': {'line': {'color': "red", 'width': 2}, 'thickness': 0.75, 'value': 100 * gpt3_5}, 'steps': interval_steps(interval), 'bgcolor': "white", 'borderwidth': 0, 'bar': {'color': "darkblue"}}
+        ), row=i + 1, col=1)
+        fig.add_annotation(text=description if interval_text is None else f"{description}<br>{interval_text}", x=0, y=fig.data[i].domain.y[0], xref="paper", yref="paper", xanchor="left", yanchor="top", showarrow=False, font={"color": "gray"})
+    
+    fig.update_layout(title=title, height=BULLET_ROW_HEIGHT * len(rows) + (40 if title else 0), margin={'t': 40 if title else 0, 'b': 20, 'l': 220 if multi_study else 110, 'r': 50})
+    
+    return fig
+
+# Function to create a Vega-Lite metric chart; bootstrap intervals are drawn as bars behind the points when the data has them
 def vega_lite_metric_chart(df):
-    domain = [min(df[["GPT-3.5 Average", "GPT-4 Average"]].min()) - 0.003, 1]
-    df_melted = df.melt(id_vars=["Study", "Metric"], value_vars=["GPT-3.5 Average", "GPT-4 Average"], var_name="Model", value_name="Value")
-    st.vega_lite_chart(
+    vega_lite_chart(*metric_chart_spec(df))
+
+# Function to build the data and Vega-Lite spec of the metric chart (shared with the static report exporter)
+def metric_chart_spec(df):
+    has_intervals = "GPT-4 Lower" in df and df["GPT-4 Lower"].notna().all()
+    lowest = df[["GPT-3.5 Lower", "GPT-4 Lower"]] if has_intervals else df[["GPT-3.5 Average", "GPT-4 Average"]]
+    domain = [round(float(min(lowest.min())) - 0.003, 4), 1]
+    with span("vega_lite_metric_chart.melt"):
+        df_melted = metric_long_frame(df, intervals=has_intervals)
+    interval_layers = [{"mark": {"type": "rule", "strokeWidth": 6, "opacity": 0.35}, "encoding": {"x": {"field": "Lower", "type": "quantitative"}, "x2": {"field": "Upper"}}}] if has_intervals else []
+    return (
         df_melted,
         {
             "encoding": {
@@ -47,36 +139,177 @@ def vega_lite_metric_chart(df):
             },
             "layer": [
                 {"mark": "line", "encoding": {"detail": {"field": "Metric", "type": "nominal"}, "color": {"value": "#db646f"}}},
+                *interval_layers,
                 {"mark": {"type": "point", "filled": True}, "encoding": {"size": {"value": 100}, "opacity": {"value": 1}}}
             ]
         },
-        use_container_width=True,
     )
 
-# Function to create a confusion matrix heatmap
+# Function to display the precision-recall and ROC curves of the threshold sweep, one line per model
+# Only the encoded columns are sent, as float32; the curves were already downsampled when they were written.
+def display_threshold_curves(df):
+    curves = df[["Model", "Threshold", *CURVE_COLUMNS]].astype({column: "float32" for column in ["Threshold", *CURVE_COLUMNS]})
+    color = {"field": "Model", "type": "nominal", "scale": {"range": ["#e6959c", "#911a24"]}, "title": "Model"}
+    tooltip = [{"field": "Threshold", "type": "quantitative", "format": ".3f"}, {"field": "Include Precision", "type": "quantitative", "format": ".3f"}, {"field": "Include Recall", "type": "quantitative", "format": ".3f"}]
+    tabs_curves = st.tabs(["Precision-Recall", "ROC"])
+    for tab, (x, y) in zip(tabs_curves, [("Include Recall", "Include Precision"), ("False Positive Rate", "Include Recall")]):
+        with tab:
+            vega_lite_chart(curves, {
+                "mark": "line",
+                "encoding": {
+                    "x": {"field": x, "type": "quantitative", "scale": {"domain": [0, 1]}},
+                    "y": {"field": y, "type": "quantitative", "scale": {"domain": [0, 1]}, "axis": {"grid": False}},
+                    "order": {"field": "Threshold", "sort": "descending"},
+                    "color": color,
+                    "tooltip": tooltip,
+                },
+            })
+
+# Function to create a confusion matrix heatmap, served from the shared figure cache
 def create_confusion_matrix(df, title):
+    return FIGURE_CACHE.get_or_create(figure_key("confusion", df, title), lambda: build_confusion_matrix(df, title))
+
+# Function to build a confusion matrix heatmap
+@timed()
+def build_confusion_matrix(df, title):
+    import plotly.graph_objects as go
     fig = go.Figure(data=go.Heatmap(z=df.iloc[:, 1:].values, x=df.columns[1:], y=df['Category'], colorscale='Blues'))
     fig.update_layout(title=title, xaxis_nticks=36)
     return fig
 
-# Function to load metrics data from a CSV file
-def load_metrics_data(csv_file):
-    return pd.read_csv(csv_file)
+# Function to create the First Review x Evaluation Step transition heatmap, served from the shared figure cache
+def create_transition_matrix(df, title):
+    return FIGURE_CACHE.get_or_create(figure_key("transitions", df, title), lambda: build_transition_matrix(df, title))
+
+# Function to build the transition heatmap; the diagonal holds the records both stages labelled alike
+@timed()
+def build_transition_matrix(df, title):
+    import plotly.graph_objects as go
+    fig = go.Figure(data=go.Heatmap(z=df.values, x=df.columns, y=df.index, colorscale='Purples', text=df.values, texttemplate="%{text}"))
+    fig.update_layout(title=title, xaxis_title="Evaluation Step (GPT-4o)", yaxis_title="First Review (GPT-3.5)", yaxis_autorange="reversed")
+    return fig
+
+# Maximum number of parsed data files kept in the process-wide cache
+DATA_CACHE_MAX_ENTRIES = 16
+
+# Content hashes of data files by path, with the (size, mtime) they were computed at
+_FILE_DIGESTS = {}
+
+# Function to compute the cache signature (mtime and content hash) of a data file
+# The file is only re-read and hashed when its size or mtime changed since the last call, so reruns just stat it.
+def file_signature(path):
+    stat = os.stat(path)
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    cached = _FILE_DIGESTS.get(path)
+    if cached is None or cached[0] != stamp:
+        digest = hashlib.sha1()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        cached = _FILE_DIGESTS[path] = (stamp, digest.hexdigest())
+    return stat.st_mtime_ns, cached[1]
+
+# Function to resolve a data file name to its columnar copy when one exists, falling back to CSV
+# A CSV newer than the columnar copy (e.g. rewritten by ingestion.py) wins, so the dashboard never shows stale converted data.
+def resolve_data_file(name):
+    csv_file = name + ".csv"
+    csv_mtime = os.stat(csv_file).st_mtime_ns if os.path.exists(csv_file) else None
+    for suffix in COLUMNAR_SUFFIXES:
+        if os.path.exists(name + suffix) and (csv_mtime is None or os.stat(name + suffix).st_mtime_ns >= csv_mtime):
+            return name + suffix
+    return csv_file
 
-# Function to load confusion matrix data from a CSV file
-def load_confusion_data(csv_file):
-    return pd.read_csv(csv_file)
+# Function to parse a data file once per signature into the compact, read-only frame shared by all sessions
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES, show_spinner=False)
+def read_data_shared(path, signature, study=None):
+    if is_columnar(path):
+        from columnar_store import read_columnar
+        return compact_frame(read_columnar(path, study=study))
+    if study is not None:
+        df = read_data_shared(path, signature)
+        return compact_frame(df[df["Study"] == study])
+    return compact_frame(pd.read_csv(path))
+
+# Function to load metrics data from a CSV, Parquet or Arrow file, optionally for a single study
+@timed()
+def load_metrics_data(data_file, study=None):
+    path = os.path.abspath(data_file)
+    return read_data_shared(path, file_signature(path), study)
+
+# Function to load confusion matrix data from a CSV, Parquet or Arrow file, optionally for a single study
+@timed()
+def load_confusion_data(data_file, study=None):
+    path = os.path.abspath(data_file)
+    return read_data_shared(path, file_signature(path), study)
+
+# Function to build the study index once per set of data file signatures
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES, show_spinner=False)
+def build_study_repository(metrics_path, metrics_signature, confusion_path, confusion_signature, study=None, curves_path=None, curves_signature=None, transitions_path=None, transitions_signature=None, thresholds_path=None, thresholds_signature=None):
+    recall_curves = read_data_shared(curves_path, curves_signature, study) if curves_path else None
+    transition_data = read_data_shared(transitions_path, transitions_signature, study) if transitions_path else None
+    threshold_curves = read_data_shared(thresholds_path, thresholds_signature, study) if thresholds_path else None
+    return StudyRepository(read_data_shared(metrics_path, metrics_signature, study), read_data_shared(confusion_path, confusion_signature, study), recall_curves, transition_data, threshold_curves)
+
+# Function to resolve an optional data file to its absolute path and signature, or (None, None) when it does not exist
+def optional_data_file(data_file):
+    if not data_file or not os.path.exists(data_file):
+        return None, None
+    path = os.path.abspath(data_file)
+    return path, file_signature(path)
+
+# Function to load the indexed study repository from the metrics and confusion data files, optionally for a single study
+# The prioritization recall curves, stage transition and threshold curve files are optional and skipped when they do not exist.
+@timed()
+def load_study_repository(metrics_file, confusion_file, study=None, curves_file=None, transitions_file=None, thresholds_file=None):
+    metrics_path = os.path.abspath(metrics_file)
+    confusion_path = os.path.abspath(confusion_file)
+    curves_path, curves_signature = optional_data_file(curves_file)
+    transitions_path, transitions_signature = optional_data_file(transitions_file)
+    thresholds_path, thresholds_signature = optional_data_file(thresholds_file)
+    return build_study_repository(metrics_path, file_signature(metrics_path), confusion_path, file_signature(confusion_path), study, curves_path, curves_signature, transitions_path, transitions_signature, thresholds_path, thresholds_signature)
+
+# Function to open the SQLite decision store once per process; its one connection is shared by every session
+@st.cache_resource(show_spinner=False)
+def load_query_repository(store_file):
+    from query_store import DecisionStore, QueryRepository
+    return QueryRepository(DecisionStore(os.path.abspath(store_file)))
+
+# Function to list the studies of a data file once per file signature, reading only its Study column
+@st.cache_resource(max_entries=DATA_CACHE_MAX_ENTRIES, show_spinner=False)
+def read_study_names(path, signature):
+    if is_columnar(path):
+        from columnar_store import read_columnar_studies
+        return read_columnar_studies(path)
+    return pd.read_csv(path, usecols=["Study"])["Study"].unique().tolist()
+
+# Function to list the studies of a metrics data file without loading their rows
+@timed()
+def load_study_names(data_file):
+    path = os.path.abspath(data_file)
+    return read_study_names(path, file_signature(path))
+
+# Function to render the page of one study, loading only that study's rows
+def render_study_page(study_name, metrics_file, confusion_file, curves_file=None, batched=False, transitions_file=None, thresholds_file=None):
+    repository = load_study_repository(metrics_file, confusion_file, study_name, curves_file, transitions_file, thresholds_file)
+    create_study_page(study_name, repository, batched=batched)
+
+# Function to display metric cards; batched mode draws every card into one figure instead of one chart per metric
+def display_metric_cards(metrics, metric_rows, font_size=1.2, batched=False):
+    from local_components import card_container
+    if batched:
+        with card_container(key="metrics_card"):
+            plotly_chart(create_batched_bullet_chart([metric_rows[metric] for metric in metrics]))
+        return
 
-# Function to display metric cards
-def display_metric_cards(metrics, metrics_data, font_size=1.2):
     num_metrics = len(metrics)
     num_cols = 2
     card_cols = [st.columns(num_cols) for _ in range((num_metrics - 1) // num_cols + 1)]
 
     for i in range(num_metrics):
         metric = metrics[i]
-        values = [metrics_data[metrics_data["Metric"] == metric][f"GPT-3.5 Average"].values[0], metrics_data[metrics_data["Metric"] == metric][f"GPT-4 Average"].values[0]]
-        description = metrics_data[metrics_data["Metric"] == metric]["Description"].values[0]
+        row = metric_rows[metric]
+        values = [row["GPT-3.5 Average"], row["GPT-4 Average"]]
+        description = row["Description"]
 
         col_index = i // num_cols
         card_index = i % num_cols
@@ -84,72 +317,198 @@ def display_metric_cards(metrics, metrics_data, font_size=1.2):
         with card_cols[col_index][card_index]:
             m_key = metric.replace(" ", "")
             with card_container(key=f"{m_key}_card"):
-                st.plotly_chart(create_bullet_chart(metric, values, f"{metric} Improvement"), use_container_width=True)
+                plotly_chart(create_bullet_chart(metric, values, f"{metric} Improvement", gpt4_interval(row)))
                 st.markdown(f"<span style='color: gray; font-size:{font_size}em'>{description}</span>", unsafe_allow_html=True)
+                intervals = format_intervals(row)
+                if intervals is not None:
+                    st.markdown(f"<span style='color: gray; font-size:{0.8 * font_size}em'>{intervals}</span>", unsafe_allow_html=True)
+
+# Function to display recall against the fraction of records screened in BM25 priority order, with the random-order baseline
+def display_recall_curve(df):
+    from local_components import card_container
+    with card_container(key="recall_curve_card"):
+        st.write("#### Screening Prioritization")
+        vega_lite_chart(df, {
+            'layer': [
+                {
+                    'mark': {'type': 'line', 'tooltip': True},
+                    'encoding': {
+                        'x': {'field': 'Fraction Screened', 'type': 'quantitative', 'axis': {'format': '%'}},
+                        'y': {'field': 'Recall', 'type': 'quantitative', 'axis': {'format': '%', 'grid': False}},
+                    },
+                },
+                {
+                    'mark': {'type': 'line', 'strokeDash': [4, 4], 'color': 'gray'},
+                    'encoding': {
+                        'x': {'field': 'Fraction Screened', 'type': 'quantitative'},
+                        'y': {'field': 'Fraction Screened', 'type': 'quantitative'},
+                    },
+                },
+            ],
+        })
+        st.markdown("<span style='color: gray; font-size:1.2em'>Share of included records found after screening a fraction of records in priority order; the dashed line is random order.</span>", unsafe_allow_html=True)
+
+# Function to display how the Evaluation Step relabelled the First Review decisions: kappas and the 3x3 transition heatmap
+def display_stage_agreement(study_name, agreement, transitions):
+    kappa_cols = st.columns(3)
+    for col, name in zip(kappa_cols, ["Cohen's Kappa", "Weighted Kappa (Linear)", "Weighted Kappa (Quadratic)"]):
+        col.metric(name, "n/a" if pd.isna(agreement[name]) else f"{agreement[name]:.4f}")
+    st.markdown(f"<span style='color: gray; font-size:1.2em'>Observed agreement {agreement['Observed Agreement']:.2%} against {agreement['Expected Agreement']:.2%} expected by chance over {agreement['Records']:,} records. Weighted kappa treats Include, Insufficient Information and Exclude as ordered, so Include to Exclude counts as a larger disagreement.</span>", unsafe_allow_html=True)
+    plotly_chart(create_transition_matrix(pd.DataFrame(transitions, index=LABELS, columns=LABELS), f"Decision Transitions ({study_name})"))
+
+# Function to show the sidebar setting that draws the metric cards of a page as one batched figure, so a rerun sends one
+# chart message instead of one per metric (or per study on the comparison dashboard)
+def batched_cards_setting():
+    return st.sidebar.checkbox("Batch metric cards into one chart", value=False, key="batched_cards", help="Fewer chart messages per rerun; useful on slow connections")
 
 # Function to create a study page
-def create_study_page(study_name, metrics_data, confusion_data):
+def create_study_page(study_name, repository, batched=False):
+    from streamlit_extras.colored_header import colored_header
     st.title(f"{study_name} Title and Abstract Screening Results")
     
     st.subheader("Performance Metrics Interpretation")
     st.write("#### The evaluation step using GPT-4o significantly improved all performance metrics:")
     
-    metrics = metrics_data["Metric"].unique()
-    display_metric_cards(metrics, metrics_data)
+    metrics = repository.metric_names(study_name)
+    display_metric_cards(metrics, repository.metric_rows(study_name), batched=batched)
+    
+    recall_curve = repository.recall_curve(study_name)
+    if recall_curve is not None:
+        display_recall_curve(recall_curve)
     
     colored_header(label="Confusion Matrix Analysis", description="Combined Summary of Metrics", color_name="violet-70")
     
-    vega_lite_metric_chart(metrics_data)
+    # Threshold sweep curves, when computed, sit next to the metric chart
+    threshold_curve = repository.threshold_curve(study_name)
+    if threshold_curve is None:
+        vega_lite_metric_chart(repository.metrics(study_name))
+    else:
+        metric_col, curve_col = st.columns(2)
+        with metric_col:
+            vega_lite_metric_chart(repository.metrics(study_name))
+        with curve_col:
+            display_threshold_curves(threshold_curve)
     
     tabs_confusion = st.tabs(["Included Studies", "Excluded Studies"])
     
     with tabs_confusion[0]:
         st.write("### Included Studies")
         st.write("This heatmap shows the confusion matrix for included studies between the initial review and the evaluation step.")
-        st.plotly_chart(create_confusion_matrix(confusion_data[confusion_data["Category"] == "Include"], "Confusion Matrix for Included Studies"), use_container_width=True)
+        plotly_chart(create_confusion_matrix(repository.confusion(study_name, "Include"), "Confusion Matrix for Included Studies"))
     
     with tabs_confusion[1]:
         st.write("### Excluded Studies")
         st.write("This heatmap shows the confusion matrix for excluded studies between the initial review and the evaluation step.")
-        st.plotly_chart(create_confusion_matrix(confusion_data[confusion_data["Category"] == "Exclude"], "Confusion Matrix for Excluded Studies"), use_container_width=True)
+        plotly_chart(create_confusion_matrix(repository.confusion(study_name, "Exclude"), "Confusion Matrix for Excluded Studies"))
+    
+    agreement = repository.agreement(study_name)
+    if agreement is not None and agreement["Records"] > 0:
+        colored_header(label="Inter-Stage Agreement", description="First Review (GPT-3.5) vs Evaluation Step (GPT-4o)", color_name="violet-70")
+        display_stage_agreement(study_name, agreement, repository.transitions(study_name))
+
+# Number of studies per page of detailed charts; dashboards with more studies than this render lazily by default
+COMPARISON_PAGE_SIZE = 10
+
+# Function to display the included and excluded confusion matrices of one study
+def display_study_confusion_matrices(repository, study):
+    st.write(f"#### Included Studies - {study}")
+    plotly_chart(create_confusion_matrix(repository.confusion(study, "Include"), f"Confusion Matrix for Included Studies ({study})"))
+    st.write(f"#### Excluded Studies - {study}")
+    plotly_chart(create_confusion_matrix(repository.confusion(study, "Exclude"), f"Confusion Matrix for Excluded Studies ({study})"))
 
 # Function to create a comparison dashboard
-def create_comparison_dashboard(metrics_data, confusion_data):
+# In lazy mode only the summary chart is eager: detailed charts are paginated and confusion matrices are drawn for the selected study only
+# In batched mode the detailed metrics of every study on the page are drawn as one multi-study bullet figure
+def create_comparison_dashboard(repository, lazy=None, page_size=COMPARISON_PAGE_SIZE, batched=False):
+    from local_components import card_container
     st.title("Comparison of LLM Title and Abstract Screening Results")
 
     st.subheader("Performance Metrics Comparison")
     
-    metrics_data_combined = pd.concat(metrics_data)
-    confusion_data_combined = pd.concat(confusion_data)
-    
-    with card_container(key="chart1"):
-        st.vega_lite_chart(metrics_data_combined, {
-            'mark': {'type': 'bar', 'tooltip': True, 'cornerRadiusEnd': 4},
-            'encoding': {
-                'x': {'field': 'Metric', 'type': 'ordinal'},
-                'y': {'field': 'Value', 'type': 'quantitative', 'axis': {'grid': False}},
-                'xOffset': {'field': 'Model'},
-                'color': {'field': 'Model'}
-            },
-        }, use_container_width=True)
+    metrics_data_combined = repository.combined_metrics()
+    studies = repository.studies
+    if lazy is None:
+        lazy = len(studies) > page_size
+    
+    # Only the encoded fields are sent, aggregated per Metric and Model when there are many studies;
+    # the payload span reports the chart's message bytes in the profiling panel
+    with span("comparison_summary.shape"):
+        summary, aggregated = comparison_payload(metrics_data_combined)
+    with card_container(key="chart1"), span("comparison_summary.payload"):
+        vega_lite_chart(summary, comparison_chart_spec(aggregated))
     
     st.write("### Detailed Performance Metrics")
     
-    st.write("The following charts show the performance metrics for all studies.")
+    if lazy:
+        num_pages = (len(studies) - 1) // page_size + 1
+        page = st.number_input(f"Page (1-{num_pages})", min_value=1, max_value=num_pages, value=1, step=1, key="comparison_metrics_page")
+        page_studies = studies[(page - 1) * page_size:page * page_size]
+        st.write(f"The following charts show the performance metrics for studies {(page - 1) * page_size + 1}-{(page - 1) * page_size + len(page_studies)} of {len(studies)}.")
+    else:
+        page_studies = studies
+        st.write("The following charts show the performance metrics for all studies.")
     
-    studies = metrics_data_combined["Study"].unique()
-    for study in studies:
-        st.write(f"#### {study}")
-        df_study = metrics_data_combined[metrics_data_combined["Study"] == study]
-        vega_lite_metric_chart(df_study)
+    if batched:
+        plotly_chart(create_batched_bullet_chart([row for study in page_studies for row in repository.metric_rows(study).values()]))
+    else:
+        for study in page_studies:
+            st.write(f"#### {study}")
+            vega_lite_metric_chart(repository.metrics(study))
     
     st.write("### Confusion Matrix Analysis")
     
-    tabs_confusion = st.tabs(studies)
-    
-    for i, study in enumerate(studies):
-        with tabs_confusion[i]:
-            st.write(f"#### Included Studies - {study}")
-            st.plotly_chart(create_confusion_matrix(confusion_data_combined[(confusion_data_combined["Study"] == study) & (confusion_data_combined["Category"] == "Include")], f"Confusion Matrix for Included Studies ({study})"), use_container_width=True)
-            st.write(f"#### Excluded Studies - {study}")
-            st.plotly_chart(create_confusion_matrix(confusion_data_combined[(confusion_data_combined["Study"] == study) & (confusion_data_combined["Category"] == "Exclude")], f"Confusion Matrix for Excluded Studies ({study})"), use_container_width=True)
+    if lazy:
+        study = st.selectbox("Select a Study", studies, key="comparison_confusion_study")
+        display_study_confusion_matrices(repository, study)
+    else:
+        tabs_confusion = st.tabs(studies)
+        for i, study in enumerate(studies):
+            with tabs_confusion[i]:
+                display_study_confusion_matrices(repository, study)
+
+# Function to get the live counters of a decision log, shared by all sessions so each decision is counted once
+@st.cache_resource(show_spinner=False)
+def live_counters(log_path):
+    return LiveCounters(log_path)
+
+# Function to draw one refresh of the live monitoring view of a study
+def display_live_study(repository, study, records, added):
+    st.write(f"#### {study}")
+    st.caption(f"{records} labelled decisions counted; {added} added by the last poll")
+    display_metric_cards(repository.metric_names(study), repository.metric_rows(study), batched=True)
+    col_include, col_exclude = st.columns(2)
+    with col_include:
+        plotly_chart(create_confusion_matrix(repository.confusion(study, "Include"), "Confusion Matrix for Included Studies"))
+    with col_exclude:
+        plotly_chart(create_confusion_matrix(repository.confusion(study, "Exclude"), "Confusion Matrix for Excluded Studies"))
+
+# Function to create the live monitoring page of an in-progress screening run
+# The page polls the counters and redraws in place; only decisions appended since the previous poll are read.
+def create_live_page(counters, refresh_seconds=LIVE_REFRESH_SECONDS, max_polls=None):
+    st.title("Live Screening Monitor")
+    added = counters.update()
+    studies = counters.accumulator.studies()
+    if not studies:
+        st.info(f"Waiting for labelled decisions in {counters.log_path}")
+        finish_rerun()
+        time.sleep(refresh_seconds)
+        st.experimental_rerun()
+    study = st.sidebar.selectbox("Select a Study", studies, key="live_study")
+
+    view = st.empty()
+    polls = 0
+    while True:
+        repository = StudyRepository(counters.metrics_frame(), counters.confusion_frame())
+        with view.container():
+            display_live_study(repository, study, counters.accumulator.records, added)
+        polls += 1
+        if polls == 1:
+            # The page keeps polling in place, so the rerun's profile ends once the first poll is drawn
+            finish_rerun()
+        if max_polls is not None and polls >= max_polls:
+            return
+        time.sleep(refresh_seconds)
+        added = counters.update()
+        if counters.accumulator.studies() != studies:
+            # Rerun so the study selector lists the newly seen studies
+            st.experimental_rerun()